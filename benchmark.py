@@ -0,0 +1,877 @@
+"""Benchmarks for the documentation builder."""
+
+import ast
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+from contextlib import contextmanager
+from os.path import join, isfile
+from tempfile import TemporaryDirectory
+
+import create_documentation as cd
+
+SAMPLE_FUNC = '''
+def func_{index}(arg1, arg2):
+    """
+    Synthetic function number {index}.
+
+    Args:
+        arg1 (int): First argument.
+        arg2 (str): Second argument.
+
+    Returns:
+        Nothing useful.
+
+    """
+    pass
+'''
+
+SAMPLE_RAISES = '''
+    Raises:
+        ValueError: Never.
+        KeyError: Not either.
+
+    """
+    pass
+'''
+
+SAMPLE_STYLES = {
+    "google": SAMPLE_FUNC,
+    "numpy": '''
+def func_{index}(arg1, arg2):
+    """
+    Synthetic function number {index}.
+
+    Parameters
+    ----------
+    arg1 : int
+        First argument.
+    arg2 : str
+        Second argument.
+
+    Returns
+    -------
+    None
+        Nothing useful.
+
+    """
+    pass
+''',
+    "rest": '''
+def func_{index}(arg1, arg2):
+    """
+    Synthetic function number {index}.
+
+    :param int arg1: First argument.
+    :param str arg2: Second argument.
+    :returns: Nothing useful.
+
+    """
+    pass
+''',
+}
+
+
+def make_module(num_funcs):
+    """
+    Build the source of a synthetic module.
+
+    Args:
+        num_funcs (int): Number of documented functions in the module.
+
+    Returns:
+        String with the module source.
+
+    """
+    parts = ['"""Synthetic module."""\n']
+    parts.extend(SAMPLE_FUNC.format(index=ind) for ind in range(num_funcs))
+    return "".join(parts)
+
+
+def make_tree(root, depth, breadth, files_per_dir, funcs_per_file=5, unique=True):
+    """
+    Write a synthetic source tree to disk.
+
+    Args:
+        root (str): Directory to create the tree in.
+        depth (int): Number of directory levels below root.
+        breadth (int): Number of subdirectories per directory.
+        files_per_dir (int): Number of python files per directory.
+        funcs_per_file (int): Number of functions per python file.
+        unique (bool): Whether every file gets distinct content, otherwise
+            all files are byte-identical.
+
+    Returns:
+        Number of python files written.
+
+    """
+    source = make_module(funcs_per_file)
+    count = 0
+    for file_ind in range(files_per_dir):
+        file_name = join(root, "module_{}.py".format(file_ind))
+        with open(file_name, "w") as out_file:
+            if unique:
+                out_file.write("# {}\n".format(file_name))
+            out_file.write(source)
+        count += 1
+    # Compiled file that should not be picked up as a python source
+    with open(join(root, "module_0.pyc"), "w") as out_file:
+        out_file.write("")
+
+    if depth > 0:
+        for dir_ind in range(breadth):
+            sub_name = join(root, "pkg_{}".format(dir_ind))
+            os.mkdir(sub_name)
+            count += make_tree(sub_name, depth - 1, breadth, files_per_dir, funcs_per_file, unique)
+
+    return count
+
+
+def make_deep_tree(root, depth):
+    """
+    Write a synthetic source tree that is a single chain of directories.
+
+    Directory names are one character long so that the deepest paths stay
+    below the operating system limit on path length.
+
+    Args:
+        root (str): Directory to create the tree in.
+        depth (int): Number of directory levels below root.
+
+    Returns:
+        Number of python files written.
+
+    """
+    source = make_module(1)
+    folder_name = root
+    for level in range(depth + 1):
+        if level:
+            folder_name = join(folder_name, "d")
+            os.mkdir(folder_name)
+        with open(join(folder_name, "m.py"), "w") as out_file:
+            out_file.write(source)
+    return depth + 1
+
+
+def remove_deep_tree(root, depth):
+    """
+    Remove a tree written by make_deep_tree, deepest directory first.
+
+    shutil.rmtree recurses once per level, so it cannot remove these trees.
+
+    Args:
+        root (str): Directory the tree was created in.
+        depth (int): Number of directory levels below root.
+
+    """
+    cwd = os.getcwd()
+    os.chdir(root)
+    try:
+        for level in range(depth, -1, -1):
+            folder_name = "/".join(["."] + ["d"] * level)
+            for entry in os.scandir(folder_name):
+                if not entry.is_dir():
+                    os.remove(entry.path)
+            if level:
+                os.rmdir(folder_name)
+    finally:
+        os.chdir(cwd)
+
+
+@contextmanager
+def count_calls(counts, names=("listdir", "scandir", "stat", "lstat")):
+    """
+    Count calls made to filesystem functions of the os module.
+
+    Args:
+        counts (dict): Dictionary to accumulate the call counts in.
+        names (tuple): Names of the os functions to count.
+
+    Returns:
+        Context manager which patches the os functions while active.
+
+    """
+    # Functions imported by name into the builder have to be patched there too
+    originals = [(module, name, getattr(module, name))
+                 for module in (os, cd) for name in names if hasattr(module, name)]
+
+    def wrap(name, func):
+        def wrapper(*args, **kwargs):
+            counts[name] = counts.get(name, 0) + 1
+            return func(*args, **kwargs)
+        return wrapper
+
+    for module, name, func in originals:
+        setattr(module, name, wrap(name, func))
+    try:
+        yield counts
+    finally:
+        for module, name, func in originals:
+            setattr(module, name, func)
+
+
+def legacy_walk(folder_name):
+    """
+    Walk a folder the way parse_folder originally listed directories.
+
+    Args:
+        folder_name (str): Directory to walk.
+
+    Returns:
+        Number of python files found.
+
+    """
+    folders = [file_ for file_ in os.listdir(folder_name) if not (isfile(file_) or ".py" in file_)]
+    folders = [file_ for file_ in folders if file_ not in cd.IGNORE_FOLDERS]
+    files = [file_ for file_ in os.listdir(folder_name) if (".py" in file_)]
+
+    count = len(files)
+    for sub_name in folders:
+        count += legacy_walk(join(folder_name, sub_name))
+    return count
+
+
+def scandir_walk(folder_name):
+    """
+    Walk a folder using scan_folder.
+
+    Args:
+        folder_name (str): Directory to walk.
+
+    Returns:
+        Number of python files found.
+
+    """
+    count = 0
+    stack = [folder_name]
+    while stack:
+        folder_name = stack.pop()
+        files, folders = cd.scan_folder(folder_name)
+        count += len(files)
+        stack.extend(join(folder_name, sub_name) for sub_name in folders)
+    return count
+
+
+def legacy_render_module(module_info):
+    """
+    Render a module by repeated string formatting, as build_files used to.
+
+    Args:
+        module_info (ModuleNode): Information about the module.
+
+    Returns:
+        String with the documentation of the module.
+
+    """
+    out_str = ""
+    if module_info.docstring:
+        out_str = "{}{}\n".format(out_str, module_info.docstring)
+    for func_child in module_info.funcs:
+        out_str = "{}{}".format(out_str, cd.build_docs_func(func_child))
+    for class_child in module_info.classes:
+        out_str = "{}{}".format(out_str, cd.build_docs_class(class_child))
+    return out_str
+
+
+def legacy_split_docstring(docstring):
+    """
+    Split a docstring into sections the way build_docs_func used to.
+
+    Args:
+        docstring (str): Docstring to split.
+
+    Returns:
+        Tuple of the Args, Returns, Raises and other paragraphs.
+
+    """
+    def startswith(input_str, match_arr):
+        return any(input_str.startswith(val) for val in match_arr)
+
+    blocks = [val.strip() for val in docstring.split("\n\n")]
+    arg_str = [val for val in blocks if startswith(val, cd.ARGUMENT_ALIASES)]
+    ret_str = [val for val in blocks if startswith(val, cd.RETURNS_ALIASES)]
+    exc_str = [val for val in blocks if startswith(val, cd.EXCEPTION_ALIASES)]
+    other_str = [val for val in blocks if not startswith(val, cd.ALL_ALIASES)]
+    return arg_str, ret_str, exc_str, other_str
+
+
+def legacy_parse_docstring(docstring):
+    """
+    Split a Google style docstring the way parse_docstring did before Raises were rendered.
+
+    Raises sections were kept as stripped lines instead of parsed entries.
+
+    Args:
+        docstring (str): Docstring to split.
+
+    Returns:
+        DocstringNode with the sections of the docstring.
+
+    """
+    output = cd.DocstringNode()
+    other = []
+    for block in docstring.split("\n\n"):
+        block = block.strip()
+        matching = cd.DOC_SECTION_RE.match(block)
+        if matching is None:
+            other.append(block)
+            continue
+
+        kind = matching.lastgroup
+        if getattr(output, kind) is not None:
+            continue
+        if kind == "returns":
+            output.returns = block[matching.end():].strip()
+        elif kind == "args":
+            output.args = cd.parse_arg_lines(block.split("\n")[1:])
+        else:
+            output.raises = [line.strip() for line in block.split("\n")[1:]]
+
+    if other:
+        output.summary = other[0]
+        output.description = " ".join(val.replace("\n", " ") for val in other[1:])
+
+    return output
+
+
+def build_ir_tree(names, docstring, num_files):
+    """
+    Build a synthetic folder of the parsed representation.
+
+    Args:
+        names (list): Function names of every module.
+        docstring (str): Docstring shared by every node.
+        num_files (int): Number of files in the folder.
+
+    Returns:
+        FolderNode of the folder.
+
+    """
+    folder = cd.FolderNode("root")
+    for file_ind in range(num_files):
+        module = cd.ModuleNode(docstring, [], [cd.FuncNode(name, docstring) for name in names])
+        file_name = "module_{}.py".format(file_ind)
+        folder.files[file_name] = cd.FileNode(file_name, str(file_ind), module)
+    return folder
+
+
+def build_dict_tree(names, docstring, num_files):
+    """
+    Build the same synthetic folder with the nested dictionaries parse_folder used to return.
+
+    Args:
+        names (list): Function names of every module.
+        docstring (str): Docstring shared by every node.
+        num_files (int): Number of files in the folder.
+
+    Returns:
+        Dictionary of the folder.
+
+    """
+    folder = {"name": "root", "type": "folder", "_folders": [], "_files": []}
+    for file_ind in range(num_files):
+        file_name = "module_{}.py".format(file_ind)
+        folder[file_name] = {
+            "type": "module", "docstring": docstring, "class_children": [],
+            "func_children": [{"name": name, "type": "func", "docstring": docstring} for name in names],
+            "name": file_name, "hash": str(file_ind),
+        }
+        folder["_files"].append(file_name)
+    return folder
+
+
+def report(title, rows):
+    """
+    Print a small results table.
+
+    Args:
+        title (str): Title of the benchmark.
+        rows (list): List of (label, value) tuples.
+
+    """
+    print("== {} ==".format(title))
+    width = max(len(label) for label, _ in rows)
+    for label, value in rows:
+        print("  {}  {}".format(label.ljust(width), value))
+    print()
+
+
+def bench_scan():
+    """Compare filesystem calls and time of the old and new directory walk."""
+    with TemporaryDirectory() as root:
+        make_tree(root, depth=3, breadth=4, files_per_dir=20, funcs_per_file=1)
+
+        rows = []
+        for label, walker in [("listdir + isfile", legacy_walk), ("scandir", scandir_walk)]:
+            counts = {}
+            with count_calls(counts):
+                found = walker(root)
+            start = time.perf_counter()
+            walker(root)
+            elapsed = time.perf_counter() - start
+            calls = ", ".join("{}={}".format(key, val) for key, val in sorted(counts.items()))
+            rows.append((label, "{:.4f}s  {} files  [{}]".format(elapsed, found, calls)))
+
+    report("Directory walk", rows)
+
+
+def bench_jobs():
+    """Compare serial parsing with parsing in a process pool."""
+    with TemporaryDirectory() as root:
+        found = make_tree(root, depth=2, breadth=4, files_per_dir=50, funcs_per_file=40)
+
+        rows = []
+        for jobs in sorted({1, 2, os.cpu_count() or 1}):
+            start = time.perf_counter()
+            cd.parse_folder(root, jobs=jobs)
+            elapsed = time.perf_counter() - start
+            rows.append(("jobs={}".format(jobs), "{:.4f}s  {} files".format(elapsed, found)))
+
+    report("Parse with process pool", rows)
+
+
+def bench_cache():
+    """Compare a cold parse with a parse reusing the on-disk cache."""
+    with TemporaryDirectory() as root, TemporaryDirectory() as cache_dir:
+        found = make_tree(root, depth=2, breadth=4, files_per_dir=50, funcs_per_file=40)
+
+        rows = []
+        for label in ["cold cache", "warm cache"]:
+            cache = cd.ParseCache(cache_dir)
+            start = time.perf_counter()
+            cd.parse_folder(root, cache=cache)
+            cache.save()
+            elapsed = time.perf_counter() - start
+            rows.append((label, "{:.4f}s  {} files".format(elapsed, found)))
+
+    report("Parse cache", rows)
+
+
+def bench_dedup():
+    """Compare parsing and rendering a tree of distinct files and of identical files."""
+    rows = []
+    for label, unique in [("distinct files", True), ("identical files", False)]:
+        with TemporaryDirectory() as root:
+            found = make_tree(root, depth=2, breadth=4, files_per_dir=50,
+                              funcs_per_file=40, unique=unique)
+            start = time.perf_counter()
+            file_info = cd.parse_folder(root)
+            parsed = time.perf_counter()
+            cd.build_files(file_info, root)
+            rendered = time.perf_counter()
+            rows.append((label, "parse {:.4f}s  render {:.4f}s  {} files".format(
+                parsed - start, rendered - parsed, found)))
+
+    report("Content deduplication", rows)
+
+
+def bench_render():
+    """Compare rendering cost per function as a module grows."""
+    rows = []
+    for num_funcs in [1250, 2500, 5000]:
+        module_info = cd.parse_module(ast.parse(make_module(num_funcs)))
+        for label, renderer in [("format", legacy_render_module), ("join", cd.build_docs_module)]:
+            start = time.perf_counter()
+            renderer(module_info)
+            elapsed = time.perf_counter() - start
+            rows.append(("{} {} funcs".format(label, num_funcs), "{:.4f}s  {:.2f}us/func".format(
+                elapsed, 1e6 * elapsed / num_funcs)))
+
+    report("Render module", rows)
+
+
+def bench_raises():
+    """Compare functions with and without a Raises section, and the parser from before Raises were rendered."""
+    num_funcs = 5000
+    source = make_module(num_funcs)
+    rows = []
+    for label, source in [("without Raises", source),
+                          ("with Raises", source.replace('\n    """\n    pass\n', SAMPLE_RAISES))]:
+        tree = ast.parse(source)
+        cd.parse_docstring.cache_clear()
+        start = time.perf_counter()
+        module_info = cd.parse_module(tree)
+        parsed = time.perf_counter()
+        cd.build_docs_module(module_info)
+        rendered = time.perf_counter()
+        rows.append((label, "parse {:.2f}us/func  render {:.2f}us/func".format(
+            1e6 * (parsed - start) / num_funcs, 1e6 * (rendered - parsed) / num_funcs)))
+
+        # The docstring parser alone, so the time of ast and of the longer source do not count
+        docstrings = [ast.get_docstring(func) for func in tree.body if isinstance(func, ast.FunctionDef)]
+        for parser_label, parser in [("current", cd.parse_google_docstring), ("before", legacy_parse_docstring)]:
+            best = None
+            for _ in range(5):
+                start = time.perf_counter()
+                for docstring in docstrings:
+                    parser(docstring)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            rows.append(("  {} parser".format(parser_label), "best of 5 {:.2f}us/docstring".format(
+                1e6 * best / len(docstrings))))
+
+    report("Raises section", rows)
+
+
+def bench_formats():
+    """Compare writing every format from one parse with parsing once per format."""
+    with TemporaryDirectory() as root:
+        found = make_tree(root, depth=2, breadth=4, files_per_dir=20, funcs_per_file=40)
+        renderers = [renderer() for renderer in cd.RENDERERS.values()]
+
+        start = time.perf_counter()
+        file_info = cd.parse_folder(root)
+        cd.build_files(file_info, root, renderers=renderers)
+        shared = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for renderer in renderers:
+            cd.parse_docstring.cache_clear()
+            file_info = cd.parse_folder(root)
+            cd.build_files(file_info, root, renderers=[renderer])
+        separate = time.perf_counter() - start
+
+    report("Output formats ({})".format(", ".join(cd.RENDERERS)), [
+        ("one parse", "{:.4f}s  {} files".format(shared, found)),
+        ("parse per format", "{:.4f}s  {} files".format(separate, found)),
+    ])
+
+
+def bench_parallel_render():
+    """Compare rendering every folder serially with the rendering process pool."""
+    with TemporaryDirectory() as root:
+        found = make_tree(root, depth=2, breadth=4, files_per_dir=30, funcs_per_file=40)
+        file_info = cd.parse_folder(root)
+        renderers = [renderer() for renderer in cd.RENDERERS.values()]
+        rows = []
+        expected = None
+        for jobs in sorted({1, 2, os.cpu_count() or 1}):
+            for datum in cd.iter_folders(file_info):
+                for renderer in renderers:
+                    output_name = join(datum.name, renderer.filename)
+                    if os.path.exists(output_name):
+                        os.remove(output_name)
+
+            start = time.perf_counter()
+            cd.build_files(file_info, root, renderers=renderers, render_jobs=jobs)
+            elapsed = time.perf_counter() - start
+
+            digests = [cd.file_digest(join(datum.name, renderer.filename))
+                       for datum in cd.iter_folders(file_info) for renderer in renderers]
+            if expected is None:
+                expected = digests
+            rows.append(("{} render jobs".format(jobs), "{:.4f}s  {} files  {}".format(
+                elapsed, found, "identical" if digests == expected else "DIFFERENT")))
+
+    report("Parallel rendering ({} formats)".format(len(renderers)), rows)
+
+
+def bench_ir():
+    """Compare parsing a 40,000 file tree with loading its saved parsed tree."""
+    with TemporaryDirectory() as root, TemporaryDirectory() as out_dir:
+        found = make_tree(root, depth=3, breadth=4, files_per_dir=470, funcs_per_file=2)
+
+        start = time.perf_counter()
+        file_info = cd.parse_folder(root, jobs=os.cpu_count() or 1)
+        rows = [("parse", "{:.4f}s  {} files".format(time.perf_counter() - start, found))]
+
+        for label, binary in [("JSON Lines", False), ("binary", True)]:
+            file_name = join(out_dir, "tree.{}".format("bin" if binary else "jsonl"))
+            start = time.perf_counter()
+            cd.dump_tree(file_info, file_name, binary)
+            dumped = time.perf_counter()
+            cd.load_tree(file_name)
+            loaded = time.perf_counter()
+            rows.append(("load " + label, "{:.4f}s  dump {:.4f}s  {:.1f} MiB".format(
+                loaded - dumped, dumped - start, os.path.getsize(file_name) / 2 ** 20)))
+
+    report("Saved parsed tree", rows)
+
+
+def bench_stream():
+    """Compare peak memory of rendering a folder in memory and streaming it."""
+    with TemporaryDirectory() as root:
+        found = make_tree(root, depth=0, breadth=0, files_per_dir=100, funcs_per_file=500)
+        file_info = cd.parse_folder(root)
+
+        rows = []
+        for label, stream in [("in memory", False), ("streaming", True)]:
+            tracemalloc.start()
+            start = time.perf_counter()
+            cd.build_files(file_info, root, stream=stream)
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            rows.append((label, "{:.4f}s  peak {:.1f} MiB  {} files".format(
+                elapsed, peak / 2 ** 20, found)))
+
+    report("Streaming render", rows)
+
+
+def bench_bounded():
+    """Compare peak memory of documenting whole trees and folder by folder."""
+    rows = []
+    folder_peak = None
+    failed = False
+    for depth in [0, 1, 2]:
+        with TemporaryDirectory() as root:
+            found = make_tree(root, depth=depth, breadth=4, files_per_dir=20, funcs_per_file=40)
+            for label, bounded in [("whole tree", False), ("low memory", True)]:
+                cd.parse_docstring.cache_clear()
+                tracemalloc.start()
+                start = time.perf_counter()
+                if bounded:
+                    cd.build_tree_bounded(root, root)
+                else:
+                    cd.build_files(cd.parse_folder(root), root)
+                elapsed = time.perf_counter() - start
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                if folder_peak is None:
+                    folder_peak = peak
+                check = ""
+                if bounded:
+                    # Peak memory must follow the largest folder, not the number of folders
+                    check = "  ok" if peak < 2 * folder_peak else "  GROWS WITH TREE"
+                    failed = failed or peak >= 2 * folder_peak
+                rows.append(("{} depth {}".format(label, depth), "{:.4f}s  peak {:.1f} MiB  {} files{}".format(
+                    elapsed, peak / 2 ** 20, found, check)))
+
+    report("Bounded memory", rows)
+    if failed:
+        sys.exit("Peak memory of the low memory mode grows with the tree")
+
+
+def bench_profile():
+    """Measure the cost of the profiling hooks, on and off."""
+    with TemporaryDirectory() as root:
+        found = make_tree(root, depth=1, breadth=4, files_per_dir=40, funcs_per_file=40)
+        rows = []
+        for label, enabled in [("profiling off", False), ("profiling on", True)]:
+            cd.parse_docstring.cache_clear()
+            profiler = cd.Profiler()
+            context = cd.profiling(profiler) if enabled else cd.NO_PROFILE
+            start = time.perf_counter()
+            with context:
+                cd.build_files(cd.parse_folder(root), root)
+            rows.append((label, "{:.4f}s  {} files".format(time.perf_counter() - start, found)))
+
+        # Every hook is a call to profile_phase, which returns a shared no-op context while off
+        num_calls = 100000
+        start = time.perf_counter()
+        for _ in range(num_calls):
+            with cd.profile_phase("parse"):
+                pass
+        per_hook = (time.perf_counter() - start) / num_calls
+        hooks = sum(profiler.calls.values())
+        rows.append(("hooks off", "{:.3f}us per hook  {} hooks  {:.4f}s per run".format(
+            1e6 * per_hook, hooks, per_hook * hooks)))
+
+    report("Profiling overhead", rows)
+
+
+def bench_extract():
+    """Compare the fast docstring scanner with ast on large generated modules."""
+    rows = []
+    for num_funcs in [1000, 5000]:
+        source = make_module(num_funcs).encode()
+        for label, fast in [("ast", False), ("fast", True)]:
+            start = time.perf_counter()
+            cd.parse_source(source, fast)
+            elapsed = time.perf_counter() - start
+            rows.append(("{} {} funcs".format(label, num_funcs), "{:.4f}s  {:.2f}us/func".format(
+                elapsed, 1e6 * elapsed / num_funcs)))
+
+    report("Docstring extraction", rows)
+
+
+def bench_sections():
+    """Compare classifying docstring sections with four passes and with one."""
+    docstring = ast.get_docstring(ast.parse(SAMPLE_FUNC.format(index=0)).body[0])
+    docstring += "\n\nMore details.\n\nRaises:\n    ValueError: Never."
+    count = 20000
+
+    rows = []
+    # The tokenizer itself, parse_docstring would only measure memo hits
+    for label, splitter in [("four passes", legacy_split_docstring), ("single pass", cd.parse_google_docstring)]:
+        start = time.perf_counter()
+        for _ in range(count):
+            splitter(docstring)
+        elapsed = time.perf_counter() - start
+        rows.append((label, "{:.4f}s  {:.2f}us/docstring".format(elapsed, 1e6 * elapsed / count)))
+
+    report("Docstring sections", rows)
+
+
+def bench_styles():
+    """Compare detecting the docstring style of a file with parsing its docstrings in every style."""
+    num_funcs = 2000
+    rows = []
+    for style, template in sorted(SAMPLE_STYLES.items()):
+        source = "".join(template.format(index=ind) for ind in range(num_funcs)).encode()
+        tree = ast.parse(source)
+        start = time.perf_counter()
+        detected = cd.detect_docstring_style(source)
+        detect = time.perf_counter() - start
+
+        docstrings = [cd.escape_docstring(ast.get_docstring(node)) for node in tree.body]
+        start = time.perf_counter()
+        for docstring in docstrings:
+            cd.DOCSTRING_STYLES[detected](docstring)
+        parse = time.perf_counter() - start
+        start = time.perf_counter()
+        for docstring in docstrings:
+            for parser in cd.DOCSTRING_STYLES.values():
+                parser(docstring)
+        probe = time.perf_counter() - start
+        rows.append((style, "detected {}  detect {:.2f}us/func  parse {:.2f}us/func  every parser {:.2f}us/func".format(
+            detected, 1e6 * detect / num_funcs, 1e6 * parse / num_funcs, 1e6 * probe / num_funcs)))
+
+    report("Docstring styles", rows)
+
+
+def bench_memo():
+    """Compare parsing repeated docstrings with and without the memo."""
+    count = 20000
+
+    rows = []
+    for distinct in [100, 1000, 10000]:
+        docstrings = [ast.get_docstring(ast.parse(SAMPLE_FUNC.format(index=ind)).body[0])
+                      for ind in range(distinct)]
+        docstrings = [docstrings[ind % distinct] for ind in range(count)]
+        for label, parser in [("plain", cd.parse_docstring.__wrapped__), ("memo", cd.parse_docstring)]:
+            cd.parse_docstring.cache_clear()
+            start = time.perf_counter()
+            for docstring in docstrings:
+                parser(docstring)
+            elapsed = time.perf_counter() - start
+            rows.append(("{} {} distinct".format(label, distinct), "{:.4f}s  {hits} hits  {misses} misses".format(
+                elapsed, **cd.docstring_memo_stats())))
+
+    report("Docstring memo (size {})".format(cd.DOCSTRING_MEMO_SIZE), rows)
+
+
+def bench_arglines():
+    """Compare the old argument regex with ARG_LINE_RE on lines full of parentheses."""
+    legacy_re = re.compile(r"(.+) \((.+)\): (.+)")
+    rows = []
+    for length in [100, 200, 400]:
+        line = "name" + " (x)" * length + ":"
+        for label, pattern in [("backtracking", legacy_re.search), ("linear", cd.ARG_LINE_RE.match)]:
+            start = time.perf_counter()
+            pattern(line)
+            elapsed = time.perf_counter() - start
+            rows.append(("{} {} chars".format(label, len(line)), "{:.6f}s".format(elapsed)))
+
+    report("Argument line parser", rows)
+
+
+def bench_prefilter():
+    """Compare parsing trivial files with ast and classifying them with the prefilter."""
+    source = "".join("from package_{0} import name_{0}\n".format(ind) for ind in range(50)).encode()
+    rows = []
+    for label, parser in [("ast", lambda src: cd.parse_module(ast.parse(src))),
+                          ("prefilter", cd.parse_source)]:
+        start = time.perf_counter()
+        for _ in range(2000):
+            parser(source)
+        elapsed = time.perf_counter() - start
+        rows.append((label, "{:.4f}s  {:.2f}us/file".format(elapsed, 1e6 * elapsed / 2000)))
+
+    report("Trivial file prefilter", rows)
+
+
+def bench_deep():
+    """Parse and render trees deeper than the recursion limit."""
+    rows = []
+    for depth in [500, 2000]:
+        with TemporaryDirectory() as root:
+            found = make_deep_tree(root, depth)
+            # Relative names keep the deepest paths below the path length limit
+            cwd = os.getcwd()
+            os.chdir(root)
+            try:
+                start = time.perf_counter()
+                file_info = cd.parse_folder(".")
+                parsed = time.perf_counter()
+                stats = cd.build_files(file_info, ".")
+                rendered = time.perf_counter()
+
+                # Only the deepest documentation file is stale, every other folder is skipped
+                cache = cd.ParseCache()
+                renderers = [cd.MarkdownRenderer()]
+                cache.set_folders(renderers, cd.folder_hashes(file_info))
+                os.remove(join(*["."] + ["d"] * depth + [cd.OUTPUT_FILENAME]))
+                start_stale = time.perf_counter()
+                stale = cd.build_files(file_info, ".", known_hashes=cache.folders, renderers=renderers)
+                rebuilt = time.perf_counter()
+            finally:
+                os.chdir(cwd)
+                remove_deep_tree(root, depth)
+            rows.append(("depth {}".format(depth), "parse {:.4f}s  render {:.4f}s  {} files  {} written".format(
+                parsed - start, rendered - parsed, found, stats["written"])))
+            rows.append(("  one stale file", "{:.4f}s  {} written".format(rebuilt - start_stale, stale["written"])))
+
+    report("Deep tree (recursion limit {})".format(sys.getrecursionlimit()), rows)
+
+
+def bench_memory():
+    """Compare the memory held by the parsed representation and by nested dictionaries."""
+    names = [sys.intern("func_{}".format(ind)) for ind in range(500)]
+    docstring = "Synthetic docstring."
+    num_files = 1000
+
+    rows = []
+    for label, builder in [("dict", build_dict_tree), ("__slots__", build_ir_tree)]:
+        tracemalloc.start()
+        tree = builder(names, docstring, num_files)
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del tree
+        rows.append((label, "{:.1f} MiB  {} functions".format(current / 2 ** 20, num_files * len(names))))
+
+    report("Parsed tree memory", rows)
+
+
+BENCHMARKS = {
+    "scan": bench_scan,
+    "jobs": bench_jobs,
+    "cache": bench_cache,
+    "dedup": bench_dedup,
+    "render": bench_render,
+    "raises": bench_raises,
+    "formats": bench_formats,
+    "parallel": bench_parallel_render,
+    "ir": bench_ir,
+    "stream": bench_stream,
+    "bounded": bench_bounded,
+    "extract": bench_extract,
+    "sections": bench_sections,
+    "styles": bench_styles,
+    "memo": bench_memo,
+    "arglines": bench_arglines,
+    "prefilter": bench_prefilter,
+    "memory": bench_memory,
+    "deep": bench_deep,
+    "profile": bench_profile,
+}
+
+
+def main(names):
+    """
+    Run the requested benchmarks.
+
+    Args:
+        names (list): Names of the benchmarks to run, all if empty.
+
+    """
+    for name in names or list(BENCHMARKS):
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
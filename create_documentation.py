@@ -1,21 +1,150 @@
 """Script to create README files for a set of folders."""
 
+import argparse
 import ast
-
-from os import listdir
-from os.path import join, isfile, dirname, realpath
+import cProfile
+import ctypes
+import ctypes.util
+import errno
+import gc
+import hashlib
+import html
+import inspect
+import json
+import pickle
+import select
+import struct
+import sys
+import threading
+import time
+import tokenize
+import zlib
+
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache, partial, wraps
+from itertools import chain
+from io import BytesIO
+from os import (O_CLOEXEC, altsep, close, fsdecode, fsencode, makedirs, read, remove, replace, scandir, sep, stat,
+                strerror)
+from os.path import join, dirname, isabs, isdir, realpath
+from queue import Queue
 
 import re
 
-IGNORE_FOLDERS = ["__pycache__", "ignore_dir", ".git", "env", ".vscode"]
+CACHE_DIRNAME = ".docstring_builder_cache"
+CACHE_FILENAME = "parse_cache.pickle"
+# Bump whenever the layout of the cache file changes, any change to this script
+# already invalidates old caches through builder_digest
+CACHE_VERSION = 9
+
+# Format and version of the parsed trees saved by dump_tree, bump the version when records change
+IR_FORMAT = "docstring_builder_ir"
+IR_VERSION = 1
+# Start of the binary form of saved trees, followed by the compressed JSON Lines
+IR_BINARY_MAGIC = b"DSBIR\0"
+
+IGNORE_FOLDERS = ["__pycache__", "ignore_dir", ".git", "env", ".vscode", CACHE_DIRNAME]
 
 ARGUMENT_ALIASES = ["Args:", "Arguments:"]
 RETURNS_ALIASES = ["Returns:"]
 EXCEPTION_ALIASES = ["Raises:"]
 ALL_ALIASES = ARGUMENT_ALIASES + RETURNS_ALIASES + EXCEPTION_ALIASES
 
+# Classifies a docstring block by its section header in a single match
+DOC_SECTION_RE = re.compile("|".join(
+    "(?P<{}>{})".format(kind, "|".join(re.escape(alias) for alias in aliases))
+    for kind, aliases in [("args", ARGUMENT_ALIASES),
+                          ("returns", RETURNS_ALIASES),
+                          ("raises", EXCEPTION_ALIASES)]))
+
+# Matches "name (type): descr", "name: descr", "*args"/"**kwargs" and dotted exception names in linear time
+ARG_LINE_RE = re.compile(r"(?P<name>\*{0,2}\w+(?:\.\w+)*)[ \t]*(?:\((?P<type>[^\n]*?)\)[ \t]*)?:(?:[ \t]+|\Z)(?P<descr>.*)")
+
 OUTPUT_FILENAME = "DOCUMENTATION.md"
 
+# Regular expressions used by fast_parse_module, string literals are unrolled to scan in linear time
+STRING_PATTERN = (r'"""[^"\\]*(?:(?:\\.|"(?!""))[^"\\]*)*"""'
+                  r"|'''[^'\\]*(?:(?:\\.|'(?!''))[^'\\]*)*'''"
+                  r'|"[^"\\\n]*(?:\\.[^"\\\n]*)*"'
+                  r"|'[^'\\\n]*(?:\\.[^'\\\n]*)*'")
+FAST_TOKEN_RE = re.compile(
+    r"^(?P<line>[ \t\f]*)(?=[^ \t\f\n#])"
+    r"|(?P<string>[bBrRuUfF]{0,2}(?:" + STRING_PATTERN + r"))"
+    r"|(?P<comment>#[^\n]*)"
+    r"|(?P<open>[(\[{])"
+    r"|(?P<close>[)\]}])"
+    r"|(?P<cont>\\\n)",
+    re.M | re.S)
+FAST_DOCSTRING_RE = re.compile(
+    r"(?P<prefix>[bBrRuUfF]{0,2})(?P<string>" + STRING_PATTERN + r")[ \t]*(?:#[^\n]*)?(?:\n|\Z)",
+    re.S)
+FAST_HEADER_RE = re.compile(r"(?:(?P<async>async)[ \t]+)?(?P<kind>def|class)[ \t]+(?P<name>\w+)")
+FAST_PREFIX_RE = re.compile(r"[bBrRuUfF]{1,2}[\"']")
+
+# Section headers of NumPy style docstrings, and the DocstringNode field they fill
+NUMPY_SECTION_KINDS = {"Parameters": "args", "Other Parameters": "args", "Returns": "returns",
+                       "Yields": "returns", "Raises": "raises"}
+NUMPY_UNDERLINE_RE = re.compile(r"[ \t]*-{3,}[ \t]*\Z")
+
+# Field lists of reST docstrings, and the DocstringNode field they fill
+REST_FIELD_KINDS = {"param": "args", "parameter": "args", "arg": "args", "argument": "args",
+                    "key": "args", "keyword": "args", "type": "type", "returns": "returns",
+                    "return": "returns", "rtype": "rtype", "raises": "raises", "raise": "raises",
+                    "except": "raises", "exception": "raises"}
+REST_FIELD_RE = re.compile(r":(?P<tag>\w+)(?:[ \t]+(?P<arg>[^:\n]*?))?[ \t]*:(?:[ \t]+|\Z)(?P<body>.*)")
+
+# Section headers of every docstring style, counted by detect_docstring_style
+DOCSTRING_STYLE_MARKERS = [
+    ("google", re.compile(rb"\n[ \t]*(?:" + b"|".join(re.escape(alias.encode()) for alias in ALL_ALIASES)
+                          + rb")[ \t]*\r?\n")),
+    ("numpy", re.compile(rb"\n[ \t]*(?:Parameters|Returns|Yields|Raises)[ \t]*\r?\n[ \t]*---")),
+    ("rest", re.compile(rb"\n[ \t]*:(?:param|parameter|arg|argument|key|keyword|type|returns?|rtype"
+                        rb"|raises?|except|exception)\b")),
+]
+
+# Byte patterns used by is_trivial_source to skip files without documentation
+TRIVIAL_DEF_RE = re.compile(rb"\b(?:def|class)\b")
+TRIVIAL_DOCSTRING_RE = re.compile(rb"(?:\xef\xbb\xbf)?(?:[ \t\f]*(?:#[^\r\n]*)?\r?\n)*[ \t\f]*[bBrRuUfF]{0,2}[\"'(\\]")
+
+# Largest number of files sent to a parser process at once
+PARSE_CHUNK_LIMIT = 64
+
+# Largest number of folders sent to a rendering process at once
+RENDER_CHUNK_LIMIT = 16
+
+# Number of distinct docstrings whose parsed sections are kept in memory
+DOCSTRING_MEMO_SIZE = 4096
+
+# Write buffer used when streaming documentation to disk
+STREAM_BUFFER_SIZE = 1 << 16
+
+# File names that are not UTF-8 are written as escapes, which read back as the same text
+OUTPUT_ERRORS = "backslashreplace"
+
+# Phases and counts reported by Profiler, in table order
+PROFILE_PHASES = ["walk", "read", "parse", "docstrings", "render", "write"]
+PROFILE_COUNTS = ["folders", "files", "classes", "functions", "bytes"]
+PROFILE_SLOWEST_FILES = 10
+
+# Profiler of the current run while profiling is on, see profiling
+PROFILER = None
+NO_PROFILE = nullcontext()
+
+# inotify event flags, from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_ISDIR = 0x40000000
+INOTIFY_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+INOTIFY_EVENT = struct.Struct("iIII")
+
 def test_func(arg1, arg2):
     """
     Test function for documentation.
@@ -35,312 +164,3114 @@ def test_func(arg1, arg2):
     pass
 
 
-def parse_folder(folder_name):
+class FolderNode:
+    """Documentation info of a folder, its python files and its subdirectories."""
+
+    __slots__ = ("name", "files", "folders", "own_hash", "tree_hash")
+    kind = "folder"
+
+    def __init__(self, name, files=None, folders=None):
+        """
+        Create the node for a folder.
+
+        Args:
+            name (str): Path of the folder.
+            files (dict): FileNode of every python file, by file name.
+            folders (dict): FolderNode of every subdirectory, by directory name.
+
+        """
+        self.name = name
+        self.files = files if files is not None else {}
+        self.folders = folders if folders is not None else {}
+        self.own_hash = None
+        self.tree_hash = None
+
+
+class FileNode:
+    """A python file, pointing at the documentation info of its content."""
+
+    __slots__ = ("name", "hash", "module")
+    kind = "file"
+
+    def __init__(self, name, digest, module):
+        """
+        Create the node for a file.
+
+        Args:
+            name (str): Path of the file.
+            digest (str): Hash of the file content.
+            module (ModuleNode): Documentation info, shared by identical files.
+
+        """
+        self.name = name
+        self.hash = digest
+        self.module = module
+
+
+class ModuleNode:
+    """Documentation info of the content of a python file."""
+
+    __slots__ = ("docstring", "doc", "classes", "funcs", "style")
+    kind = "module"
+
+    def __init__(self, docstring=None, classes=None, funcs=None, doc=None, style="google"):
+        """
+        Create the node for a module.
+
+        Args:
+            docstring (str): Module docstring.
+            classes (list): ClassNode of every top level class.
+            funcs (list): FuncNode of every top level function.
+            doc (DocstringNode): Sections of the docstring.
+            style (str): Docstring style of the file, a key of DOCSTRING_STYLES.
+
+        """
+        self.docstring = docstring
+        self.doc = doc
+        self.classes = classes if classes is not None else []
+        self.funcs = funcs if funcs is not None else []
+        self.style = style
+
+
+class ClassNode:
+    """Documentation info of a class."""
+
+    __slots__ = ("name", "docstring", "doc", "funcs")
+    kind = "class"
+
+    def __init__(self, name, docstring=None, funcs=None, doc=None):
+        """
+        Create the node for a class.
+
+        Args:
+            name (str): Name of the class.
+            docstring (str): Class docstring.
+            funcs (list): FuncNode of every method.
+            doc (DocstringNode): Sections of the docstring.
+
+        """
+        self.name = sys.intern(name)
+        self.docstring = docstring
+        self.doc = doc
+        self.funcs = funcs if funcs is not None else []
+
+
+class FuncNode:
+    """Documentation info of a function."""
+
+    __slots__ = ("name", "docstring", "doc")
+    kind = "func"
+
+    def __init__(self, name, docstring=None, doc=None):
+        """
+        Create the node for a function.
+
+        Args:
+            name (str): Name of the function.
+            docstring (str): Function docstring.
+            doc (DocstringNode): Sections of the docstring.
+
+        """
+        self.name = sys.intern(name)
+        self.docstring = docstring
+        self.doc = doc
+
+
+class DocstringNode:
+    """Sections of a Google style docstring."""
+
+    __slots__ = ("summary", "description", "args", "returns", "raises")
+    kind = "docstring"
+
+    def __init__(self, summary=None, description="", args=None, returns=None, raises=None):
+        """
+        Create the node for a docstring.
+
+        Args:
+            summary (str): First paragraph of the docstring.
+            description (str): Remaining paragraphs, joined into one line.
+            args (list): (name, type, description) of every argument in
+                the Args section, None without one. The type is None when
+                it is not given, and the name is None for text before the
+                first argument.
+            returns (str): Body of the Returns section, None without one.
+            raises (list): (exception, type, description) of every entry
+                in the Raises section like args, None without one.
+
+        """
+        self.summary = summary
+        self.description = description
+        self.args = args
+        self.returns = returns
+        self.raises = raises
+
+
+def parse_folder(folder_name, threads=1, jobs=1, cache=None):
     """
     Build documentation for the folder.
 
     Args:
         folder_name (str): Directory to parse.
+        threads (int): Number of threads used to walk sibling subdirectories
+            concurrently. The tree is walked serially when this is 1.
+        jobs (int): Number of processes used to parse the python files.
+            Files are parsed while walking the tree when this is 1.
+        cache (ParseCache): Cache of parse results to reuse. An in-memory
+            cache is used when this is None, so identical files are still
+            parsed only once.
     
     Returns:
-        Dictionary with the docstring information for all files in that folder.
+        FolderNode with the docstring information for all files in that folder.
 
     """
-    output = {}
-    output["name"] = folder_name
-    output["type"] = "folder"
+    if cache is None:
+        cache = ParseCache()
 
-    # Get list of folders to build documentation for
-    folders = [file_ for file_ in listdir(folder_name) if not (isfile(file_) or ".py" in file_)]
-    folders = [file_ for file_ in folders if file_ not in IGNORE_FOLDERS]
+    parse = jobs <= 1
+    if threads > 1:
+        output = parse_folder_threaded(folder_name, threads, parse, cache)
+    else:
+        output = walk_folder(folder_name, parse, cache)
 
-    files = [file_ for file_ in listdir(folder_name) if (".py" in file_)]
+    if not parse:
+        parse_tree_files(output, jobs, cache)
 
-    # print("\n\nBASE: {}".format(folder_name))
-    # print("\tFOLDERS: {}".format(folders))
-    # print("\tFILES: {}".format(files))
+    hash_folder(output)
+    return output
 
-    for file_name in files:
-        output[file_name] = parse_file(join(folder_name, file_name))
 
-    for sub_name in folders:
-        output[sub_name] = parse_folder(join(folder_name, sub_name))
+def hash_folder(file_info):
+    """
+    Compute the Merkle hashes of a parsed folder and all its subdirectories.
 
-    output["_folders"] = folders
-    output["_files"] = files
+    The own hash of a folder covers everything its documentation is
+    rendered from: its name, its files and their content, and the names
+    of its subdirectories. The tree hash also covers the tree hashes of
+    its subdirectories, so it only matches a previous run when nothing in
+    the whole subtree changed.
 
-    return output
+    Args:
+        file_info (FolderNode): Directory info from parse_folder, updated in place.
 
+    Returns:
+        The tree hash of the folder.
 
-def parse_file(file_name):
     """
-    Get the documentation of the python file.
+    builder_hash = builder_digest().encode()
+
+    # Subdirectories come after their parent, so walk backwards to hash children first
+    for datum in reversed(list(iter_folders(file_info))):
+        datum.own_hash = folder_own_hash(datum, builder_hash)
+        datum.tree_hash = folder_tree_hash(datum.own_hash,
+                                           [sub_info.tree_hash for sub_info in datum.folders.values()])
+
+    return file_info.tree_hash
+
+
+def folder_own_hash(datum, builder_hash):
+    """
+    Compute the hash of everything the documentation of one folder is rendered from.
 
     Args:
-        file_name (str): File name to parse.
+        datum (FolderNode): Folder with parsed files, its subdirectories
+            only need to be listed.
+        builder_hash (bytes): Output of builder_digest.
 
     Returns:
-        Dictionary with the information of the docstrings in the file.
+        Hex digest of the folder.
 
     """
-    # print("\nPARSING_FILE: {}".format(file_name))
-    with open(file_name) as file_:
-        code = ast.parse(file_.read())
-    output = parse_module(code)
-    output["name"] = file_name
+    own_hash = hashlib.sha1(builder_hash)
+    own_hash.update(fsencode(datum.name))
+    # build_files moves __init__.py to the front, so hash in a fixed order
+    for file_name in sorted(datum.files):
+        own_hash.update(fsencode("\0{}\0{}".format(file_name, datum.files[file_name].hash)))
+    for sub_name in datum.folders:
+        own_hash.update(fsencode("\0{}/".format(sub_name)))
+    return own_hash.hexdigest()
 
-    return output
 
+def folder_tree_hash(own_hash, tree_hashes):
+    """
+    Compute the hash of a folder and its whole subtree.
+
+    Args:
+        own_hash (str): Output of folder_own_hash for the folder.
+        tree_hashes (list): Tree hashes of its subdirectories, in order.
+
+    Returns:
+        Hex digest of the subtree.
 
-def parse_module(module_node):
     """
-    Parse Module level node.
+    tree_hash = hashlib.sha1(own_hash.encode())
+    for sub_hash in tree_hashes:
+        tree_hash.update(sub_hash.encode())
+    return tree_hash.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def builder_digest():
+    """
+    Hash the source of this script, so that changes to it invalidate old hashes.
+
+    Returns:
+        Hex digest of this file.
+
+    """
+    with open(realpath(__file__), "rb") as source_file:
+        return hashlib.sha1(source_file.read()).hexdigest()
+
+
+def folder_hashes(file_info):
+    """
+    Collect the Merkle hashes of a folder and all its subdirectories.
 
     Args:
-        module_node (_ast.Module): AST Node for this module.
+        file_info (FolderNode): Directory info from parse_folder.
 
     Returns:
-        Dictionary with the documentation info for this node.
+        Dictionary of folder name to (own hash, tree hash).
 
     """
-    output = {}
+    return {datum.name: (datum.own_hash, datum.tree_hash) for datum in iter_folders(file_info)}
 
-    # Get Module docstring
-    output["type"] = "module"
-    output["docstring"] = ast.get_docstring(module_node)
-    output["class_children"] = []
-    output["func_children"] = []
 
-    for child_node in ast.iter_child_nodes(module_node):
-        if isinstance(child_node, ast.ClassDef):
-            output["class_children"].append(parse_class(child_node))
-        elif isinstance(child_node, ast.FunctionDef):
-            output["func_children"].append(parse_func(child_node))
+def count_folders(file_info):
+    """
+    Count a folder and all its subdirectories.
 
-    return output
+    Args:
+        file_info (FolderNode): Directory info from parse_folder.
 
+    Returns:
+        Number of folders in the tree.
 
-def parse_class(class_node):
     """
-    Parse Class level node.
+    return sum(1 for _ in iter_folders(file_info))
+
+
+def iter_folders(file_info):
+    """
+    Iterate over a folder and all its subdirectories, parents first.
+
+    Uses an explicit stack, so the depth of the tree is not limited by
+    the recursion limit.
 
     Args:
-        module_node (_ast.ClassDef): AST Node for this class.
+        file_info (FolderNode): Directory info from parse_folder.
 
     Returns:
-        Dictionary with the documentation info for this node.
+        Iterator over the FolderNode of every folder in the tree, in the
+        same depth first order as the folders are listed.
 
     """
-    # print("CLASS: {}".format(class_node.name))
+    stack = [file_info]
+    while stack:
+        datum = stack.pop()
+        yield datum
+        stack.extend(reversed(list(datum.folders.values())))
 
-    output = {}
-    output["name"] = class_node.name
-    output["type"] = "class"
-    output["docstring"] = ast.get_docstring(class_node)
-    output["func_children"] = []
 
-    for child_node in ast.iter_child_nodes(class_node):
-        if isinstance(child_node, ast.FunctionDef):
-            output["func_children"].append(parse_func(child_node))
+def walk_folder(folder_name, parse=True, cache=None):
+    """
+    Walk the folder and its subdirectories depth first.
+
+    Args:
+        folder_name (str): Directory to walk.
+        parse (bool): Whether to parse the python files while walking.
+        cache (ParseCache): Cache of parse results to reuse, if any.
+
+    Returns:
+        FolderNode with the docstring information for all files in that folder.
+
+    """
+    output = parse_folder_files(folder_name, parse, cache)
+    stack = [output]
+    while stack:
+        datum = stack.pop()
+        for sub_name in reversed(list(datum.folders)):
+            sub_info = datum.folders[sub_name] = parse_folder_files(join(datum.name, sub_name), parse, cache)
+            stack.append(sub_info)
 
     return output
 
 
-def parse_func(func_node):
+def parse_folder_threaded(folder_name, threads, parse=True, cache=None):
     """
-    Parse Function level node.
+    Build documentation for the folder, walking subdirectories in a thread pool.
+
+    Every directory is listed and parsed by a worker as soon as its parent
+    has been listed, and the results are attached to their parent by name,
+    so the output is the same as the serial walk regardless of worker count.
 
     Args:
-        module_node (_ast.FunctionDef): AST Node for this Function
+        folder_name (str): Directory to parse.
+        threads (int): Maximum number of worker threads.
+        parse (bool): Whether to parse the python files while walking.
+        cache (ParseCache): Cache of parse results to reuse, if any.
 
     Returns:
-        Dictionary with the documentation info for this node.
+        FolderNode with the docstring information for all files in that folder.
 
     """
-    # print("FUNCTION: {}".format(func_node.name))
+    output = None
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        pending = {pool.submit(parse_folder_files, folder_name, parse, cache): (None, None)}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                parent, sub_name = pending.pop(future)
+                datum = future.result()
+                if parent is None:
+                    output = datum
+                else:
+                    parent.folders[sub_name] = datum
+
+                for child_name in datum.folders:
+                    future = pool.submit(parse_folder_files, join(datum.name, child_name), parse, cache)
+                    pending[future] = (datum, child_name)
+
+    return output
+
+
+def parse_folder_files(folder_name, parse=True, cache=None):
+    """
+    Parse the python files directly inside a folder.
+
+    Subdirectories are listed in the output but not parsed.
+
+    Args:
+        folder_name (str): Directory to parse.
+        parse (bool): Whether to parse the files, or only list them
+            with a placeholder of None.
+        cache (ParseCache): Cache of parse results to reuse, if any.
+
+    Returns:
+        FolderNode with the docstring information for the files in that folder.
 
-    output = {}
-    output["name"] = func_node.name
-    output["type"] = "func"
-    output["docstring"] = ast.get_docstring(func_node)
+    """
+    # Get list of files and folders to build documentation for
+    files, folders = scan_folder(folder_name)
 
-    output["docstring"] = output["docstring"].replace("<", "\<")
-    output["docstring"] = output["docstring"].replace(">", "\>")
+    output = FolderNode(folder_name, dict.fromkeys(files), dict.fromkeys(folders))
+    if parse:
+        for file_name in files:
+            output.files[file_name] = parse_file(join(folder_name, file_name), cache)
+        if PROFILER is not None:
+            PROFILER.count_folder(output)
 
     return output
 
 
-def build_files(file_info, base_path):
+def parse_tree_files(file_info, jobs, cache=None):
     """
-    Actually build the documentation.
-    
+    Parse every file of an already walked tree in a process pool.
+
+    Files are handed to the workers in walk order and the results are
+    written back in the same order. Files are sent in chunks so that
+    small files are not dominated by the inter-process overhead. Files
+    found in the cache are not sent to the workers at all. The others are
+    read and hashed once here, and their content is sent to the workers,
+    so the parse result always belongs to the content that was hashed.
+
     Args:
-        file_info (dict): All the directory info from earlier steps.
+        file_info (FolderNode): Tree from walk_folder with unparsed files.
+        jobs (int): Number of worker processes.
+        cache (ParseCache): Cache of parse results to reuse, if any.
 
     """
-    # Build header
-    module_name = file_info["name"].replace(base_path, "")
-    if "\\" in module_name:
-        module_name = module_name.replace("\\", "")
-    if not module_name:
-        module_name = "Base Directory"
-    output_str = "# Module: `{}`\n".format(module_name)
+    if cache is None:
+        cache = ParseCache()
+
+    slots = [(datum, file_name) for datum in iter_folders(file_info) for file_name in datum.files]
+
+    # Only the first file with a given content is sent to the workers
+    missing = {}
+    sources = []
+    for datum, file_name in slots:
+        path = join(datum.name, file_name)
+        digest, source, module = cache.lookup(path)
+        if module is None:
+            if digest not in missing:
+                sources.append(source)
+            missing.setdefault(digest, []).append((datum, file_name))
+        else:
+            datum.files[file_name] = FileNode(path, digest, module)
 
-    # Make sure that the __init__.py is at the front
-    try:
-        init_ind = file_info["_files"].index("__init__.py")
-        del file_info["_files"][init_ind]
-        file_info["_files"] = ["__init__.py"] + file_info["_files"]
-    except ValueError:
-        pass
+    paths = [join(datum.name, file_name) for (datum, file_name), *_ in missing.values()]
+    worker = partial(parse_file_source, fast=cache.fast)
+    if len(paths) < 2 * jobs:
+        results = map(worker, paths, sources)
+    else:
+        chunksize = max(1, min(PARSE_CHUNK_LIMIT, len(paths) // (jobs * 4)))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(worker, paths, sources, chunksize=chunksize))
 
-    for file_name in file_info["_files"]:
-        # Document files in the folder
-        datum = file_info[file_name]
+    for (digest, copies), module in zip(missing.items(), results):
+        module = cache.put(digest, module)
+        for datum, file_name in copies:
+            datum.files[file_name] = FileNode(join(datum.name, file_name), digest, module)
 
-        output_str = "{}## File: `{}`\n".format(output_str, file_name)
-        if datum["docstring"]:
-            output_str = "{}{}\n".format(output_str, datum["docstring"])
+    if PROFILER is not None:
+        for datum in iter_folders(file_info):
+            PROFILER.count_folder(datum)
 
-        for func_child in datum["func_children"]:
-            output_str = "{}{}".format(output_str, build_docs_func(func_child))
 
-        for class_child in datum["class_children"]:
-            output_str = "{}{}".format(output_str, build_docs_class(class_child))
+def scan_folder(folder_name):
+    """
+    List the python files and subdirectories of a folder in one pass.
 
-    if file_info["_folders"]:
-        output_str = "{}## Subdirectory Links:\n".format(output_str)
-        for folder_name in file_info["_folders"]:
-            # Create documentation for files in folder
-            datum = file_info[folder_name]
-            build_files(datum, file_info["name"])
+    Uses the type information cached on each directory entry, so
+    no additional stat calls are made for the entries themselves.
 
-            # Add Subdir links
-            subdir_link = join(datum["name"].replace(file_info["name"], ""), OUTPUT_FILENAME).replace("\\", "/")
-            if subdir_link.startswith("/"):
-                subdir_link = subdir_link[1:]
+    Args:
+        folder_name (str): Directory to scan.
 
-            output_str = "{output_str}- [{folder_name}]({link})\n".format(
-                output_str=output_str,
-                folder_name=datum["name"].replace(base_path, ""),
-                link=subdir_link
-            )
+    Returns:
+        Tuple of sorted lists (python file names, subdirectory names).
 
-    with open(join(file_info["name"], OUTPUT_FILENAME), 'w') as out_file:
-        out_file.write(output_str)
+    """
+    files = []
+    folders = []
+    with profile_phase("walk"), scandir(folder_name) as entries:
+        for entry in entries:
+            if entry.name.endswith(".py"):
+                if entry.is_file():
+                    files.append(sys.intern(entry.name))
+            elif entry.name not in IGNORE_FOLDERS and entry.is_dir():
+                folders.append(entry.name)
+
+    files.sort()
+    folders.sort()
+    return files, folders
+
+
+def parse_file(file_name, cache=None):
+    """
+    Get the documentation of the python file.
+
+    Args:
+        file_name (str): File name to parse.
+        cache (ParseCache): Cache of parse results to reuse, if any.
+
+    Returns:
+        FileNode with the information of the docstrings in the file.
+
+    """
+    # print("\nPARSING_FILE: {}".format(file_name))
+    if cache is None:
+        _, digest, module = parse_source_file(file_name)
+    else:
+        digest, module = cache.parse(file_name)
 
+    return FileNode(file_name, digest, module)
 
-def arr_startswith(input_str, match_arr):
+
+def parse_source_file(file_name, fast=False):
     """
-    Test if string starts with any member of array.
+    Read and parse a python file.
 
-    Arguments:
-        input_str (str): String to check against.
-        match_arr (list): List of items to check for.
+    Args:
+        file_name (str): File name to parse.
+        fast (bool): Whether to try fast_parse_module before ast.
 
     Returns:
-        True if input_str starts with amy member of match_arr
+        Tuple (stat key, content hash, ModuleNode) for the file.
 
     """
-    for item in match_arr:
-        if input_str.startswith(item):
-            return True
+    with profile_phase("read"):
+        stat_key = file_stat_key(file_name)
+        with open(file_name, "rb") as file_:
+            source = file_.read()
+        digest = hashlib.sha1(source).hexdigest()
+    if PROFILER is not None:
+        PROFILER.add(bytes=len(source))
 
-    return False
+    return stat_key, digest, parse_file_source(file_name, source, fast)
 
 
-def build_docs_func(func_info):
+def parse_file_source(file_name, source, fast=False):
     """
-    Build documentation for a function.
-    
+    Parse the content already read from a python file.
+
     Args:
-        func_info (dict): Information about this function.
+        file_name (str): File the content was read from.
+        source (bytes): Content of the file.
+        fast (bool): Whether to try fast_parse_module before ast.
+
+    Returns:
+        ModuleNode with the documentation info for this module.
 
     """
-    out_str = "### Function: `{}`\n".format(func_info["name"])
+    with profile_phase("parse", file_name):
+        return parse_source(source, fast)
 
-    if func_info.get("docstring") and func_info["docstring"]:
-        func_doc_arr = func_info["docstring"].split("\n\n")
-        func_doc_arr = [val.strip() for val in func_doc_arr]
 
-        arg_str = [docstr for docstr in func_doc_arr if arr_startswith(docstr, ARGUMENT_ALIASES)]
-        ret_str = [docstr for docstr in func_doc_arr if arr_startswith(docstr, RETURNS_ALIASES)]
-        exc_str = [docstr for docstr in func_doc_arr if arr_startswith(docstr, EXCEPTION_ALIASES)]
-        other_str = [docstr for docstr in func_doc_arr if not arr_startswith(docstr, ALL_ALIASES)]
+def parse_source(source, fast=False):
+    """
+    Parse the source of a python file.
 
-        # Build function description 
-        if other_str:
-            out_str = "{}{}\n".format(out_str, other_str[0])
-            other_str = [val.replace("\n", " ") for val in other_str]
-            if len(other_str) > 1:
-                out_str = "{}\n#### Description\n{}\n".format(out_str, " ".join(other_str[1:]))
+    Args:
+        source (bytes): Content of the python file.
+        fast (bool): Whether to try fast_parse_module before ast.
 
-        # Build documentation for Arguments
-        out_str = "{}#### Arguments:".format(out_str)
-        if arg_str:
-            arg_str = arg_str[0]
-            args = [val.strip() for val in arg_str.split("\n")[1:]]
-            for arg in args:
-                matching = re.search("(.+) \((.+)\): (.+)", arg)
-                if matching is not None:
-                    name, type_, descr = matching.groups()
-                    out_str = "{out_str}\n- {name}\n  - Type: {type}\n  - {descr}".format(
-                        out_str=out_str,
-                        name=name,
-                        type=type_,
-                        descr=descr.strip()
-                    )
-                else:
-                    out_str = "{out_str} {descr_cont}".format(
-                        out_str=out_str,
-                        descr_cont=arg.strip()
-                    )
-            out_str = "{}\n".format(out_str)
-        else:
-            out_str = "{}\n_None_\n".format(out_str)
+    Returns:
+        ModuleNode with the documentation info for this module.
 
-        # Build documentation for Returns
-        out_str = "{}#### Returns:\n".format(out_str)
-        if ret_str:
-            ret_str = ret_str[0].replace("Returns:\n","").strip()
-            out_str = "{}{}\n".format(out_str, ret_str)
-        else:
-            out_str = "{}_None_\n".format(out_str)
+    """
+    if is_trivial_source(source):
+        return ModuleNode()
 
-        # TODO: Add exceptions
+    style = detect_docstring_style(source)
+    if fast:
+        try:
+            return fast_parse_module(source, style)
+        except FastParseError:
+            pass
 
-    out_str = "{}\n".format(out_str)
-    return out_str
+    return parse_module(ast.parse(source), style)
 
 
-def build_docs_class(class_info):
+def detect_docstring_style(source):
     """
-    Build documentation for a class.
-    
+    Guess the docstring style of a python file from its source.
+
+    The style is detected once per file and stored with its ModuleNode, so
+    docstrings are never probed against every parser. Counting the section
+    headers of every style keeps a few docstrings quoted in strings from
+    deciding the style of a whole file.
+
+    Args:
+        source (bytes): Content of the python file.
+
+    Returns:
+        Key of DOCSTRING_STYLES with the most section headers in the file,
+        "google" if there are none.
+
+    """
+    output, most = "google", 0
+    # Ties go to the style listed first in DOCSTRING_STYLE_MARKERS
+    for style, marker in DOCSTRING_STYLE_MARKERS:
+        count = len(marker.findall(source))
+        if count > most:
+            output, most = style, count
+    return output
+
+
+def is_trivial_source(source):
+    """
+    Check cheaply whether a file cannot contain anything worth documenting.
+
+    A file is trivial when it has no def or class keyword anywhere and its
+    first statement does not start like a string. Strings and comments are
+    not skipped, so a stray keyword only makes the check give up, never
+    lose documentation. Syntax errors in trivial files are not reported.
+
     Args:
-        class_info (dict): Information about this class.
+        source (bytes): Content of the python file.
+
+    Returns:
+        True if the file has no docstrings, classes or functions.
 
     """
-    out_str = "### Class: `{}`\n".format(class_info["name"])
+    return TRIVIAL_DEF_RE.search(source) is None and TRIVIAL_DOCSTRING_RE.match(source) is None
+
 
-    if class_info.get("docstring"):
-        out_str = "{}{}\n".format(out_str, class_info["docstring"])
+def file_stat_key(file_name):
+    """
+    Get the part of a file's stat used to detect changes cheaply.
 
-    for func_child in class_info["func_children"]:
-        out_str = "{}{}".format(out_str, build_docs_func(func_child))
+    Args:
+        file_name (str): File name to stat.
 
-    # print(class_info)
-    return out_str
+    Returns:
+        Tuple of the modification time in nanoseconds and the size.
 
+    """
+    file_stat = stat(file_name)
+    return file_stat.st_mtime_ns, file_stat.st_size
 
-def create_documentation():
-    """Function to create documentation."""
-    current_dir = dirname(realpath(__file__))
 
-    # Get the documentation for this (and all sub) directories
-    file_info = parse_folder(current_dir)
-    build_files(file_info, current_dir)
+def output_stat_key(file_name):
+    """
+    Get the stat key of a documentation file, if it exists.
+
+    Args:
+        file_name (str): File name to stat.
+
+    Returns:
+        Output of file_stat_key, or None if the file does not exist.
+
+    """
+    try:
+        return file_stat_key(file_name)
+    except OSError:
+        return None
+
+
+def is_output_current(file_name, stat_key):
+    """
+    Check that a documentation file is still the one recorded after the last build.
+
+    Args:
+        file_name (str): Documentation file.
+        stat_key (tuple): Stat key recorded by ParseCache.set_folders, may be None.
+
+    Returns:
+        True if the file exists with the recorded stat key.
+
+    """
+    return stat_key is not None and output_stat_key(file_name) == stat_key
+
+
+def parse_module(module_node, style="google"):
+    """
+    Parse Module level node.
+
+    Args:
+        module_node (_ast.Module): AST Node for this module.
+        style (str): Docstring style of the module, a key of DOCSTRING_STYLES.
+
+    Returns:
+        ModuleNode with the documentation info for this node.
+
+    """
+    # Get Module docstring
+    docstring = ast.get_docstring(module_node)
+    output = ModuleNode(docstring, doc=parse_docstring(docstring, style), style=style)
+
+    for child_node in ast.iter_child_nodes(module_node):
+        if isinstance(child_node, ast.ClassDef):
+            output.classes.append(parse_class(child_node, style))
+        elif isinstance(child_node, ast.FunctionDef):
+            output.funcs.append(parse_func(child_node, style))
+
+    return output
+
+
+def parse_class(class_node, style="google"):
+    """
+    Parse Class level node.
+
+    Args:
+        module_node (_ast.ClassDef): AST Node for this class.
+        style (str): Docstring style of the module, a key of DOCSTRING_STYLES.
+
+    Returns:
+        ClassNode with the documentation info for this node.
+
+    """
+    # print("CLASS: {}".format(class_node.name))
+
+    docstring = ast.get_docstring(class_node)
+    output = ClassNode(class_node.name, docstring, doc=parse_docstring(docstring, style))
+
+    for child_node in ast.iter_child_nodes(class_node):
+        if isinstance(child_node, ast.FunctionDef):
+            output.funcs.append(parse_func(child_node, style))
+
+    return output
+
+
+def parse_func(func_node, style="google"):
+    """
+    Parse Function level node.
+
+    Args:
+        module_node (_ast.FunctionDef): AST Node for this Function
+        style (str): Docstring style of the module, a key of DOCSTRING_STYLES.
+
+    Returns:
+        FuncNode with the documentation info for this node.
+
+    """
+    # print("FUNCTION: {}".format(func_node.name))
+
+    docstring = ast.get_docstring(func_node)
+    return FuncNode(func_node.name, docstring, doc=parse_docstring(docstring, style))
+
+
+@lru_cache(maxsize=DOCSTRING_MEMO_SIZE)
+def parse_docstring(docstring, style="google"):
+    """
+    Split a docstring into its sections with the parser of its style.
+
+    Docstrings are split once while parsing, so the result is stored in
+    the parse cache and shared by every render. Results are memoized by
+    docstring text and style, so repeated docstrings share one
+    DocstringNode, which must not be modified.
+
+    Args:
+        docstring (str): Docstring to split, may be None.
+        style (str): Docstring style, a key of DOCSTRING_STYLES.
+
+    Returns:
+        DocstringNode with the sections of the docstring, or None for an
+        empty docstring.
+
+    """
+    if not docstring:
+        return None
+
+    return DOCSTRING_STYLES[style](docstring)
+
+
+def parse_google_docstring(docstring):
+    """
+    Split a Google style docstring into its sections.
+
+    Every paragraph is classified once by DOC_SECTION_RE. Only the first
+    section of each kind is kept, and paragraphs that are not a section
+    make up the summary and description.
+
+    Args:
+        docstring (str): Docstring to split.
+
+    Returns:
+        DocstringNode with the sections of the docstring.
+
+    """
+    output = DocstringNode()
+    other = []
+    for block in docstring.split("\n\n"):
+        block = block.strip()
+        matching = DOC_SECTION_RE.match(block)
+        if matching is None:
+            other.append(block)
+            continue
+
+        kind = matching.lastgroup
+        if getattr(output, kind) is not None:
+            continue
+        if kind == "returns":
+            output.returns = block[matching.end():].strip()
+        else:
+            setattr(output, kind, parse_arg_lines(block.split("\n")[1:]))
+
+    set_description(output, other)
+    return output
+
+
+def parse_numpy_docstring(docstring):
+    """
+    Split a NumPy style docstring into its sections.
+
+    A section starts at a header line underlined with dashes. Sections not
+    in NUMPY_SECTION_KINDS, such as Notes or Examples, are added to the
+    description.
+
+    Args:
+        docstring (str): Docstring to split.
+
+    Returns:
+        DocstringNode with the sections of the docstring.
+
+    """
+    lines = docstring.split("\n")
+    sections = [(None, [])]
+    pos = 0
+    while pos < len(lines):
+        line = lines[pos]
+        if line.strip() and pos + 1 < len(lines) and NUMPY_UNDERLINE_RE.match(lines[pos + 1]):
+            sections.append((line.strip(), []))
+            pos += 2
+            continue
+        sections[-1][1].append(line)
+        pos += 1
+
+    output = DocstringNode()
+    other = []
+    for header, body in sections:
+        kind = NUMPY_SECTION_KINDS.get(header)
+        if header is None:
+            other.extend(val.strip() for val in "\n".join(body).split("\n\n") if val.strip())
+        elif kind is None:
+            other.append("{}: {}".format(header, " ".join(line.strip() for line in body if line.strip())))
+        elif getattr(output, kind) is None:
+            entries = parse_numpy_entries(body)
+            if kind == "returns":
+                output.returns = "\n".join(format_return_entry(*entry) for entry in entries)
+            else:
+                setattr(output, kind, entries)
+
+    set_description(output, other)
+    return output
+
+
+def parse_numpy_entries(lines):
+    """
+    Parse the lines of a NumPy style section into entries.
+
+    An entry starts with a "name : type" or "name" line that is not
+    indented further than the first line, and is described by the more
+    indented lines below it.
+
+    Args:
+        lines (list): Lines of the section, without the header.
+
+    Returns:
+        List of (name, type, description) tuples like parse_arg_lines.
+
+    """
+    entries = []
+    indent = None
+    for line in lines:
+        text = line.lstrip()
+        if not text:
+            continue
+        line_indent = len(line) - len(text)
+        if indent is None:
+            indent = line_indent
+        text = text.rstrip()
+
+        if line_indent <= indent:
+            name, sep, type_ = text.partition(" : ")
+            entries.append((name.strip(), type_.strip() if sep else None, ""))
+        elif entries:
+            name, type_, descr = entries[-1]
+            entries[-1] = (name, type_, "{} {}".format(descr, text) if descr else text)
+        else:
+            entries.append((None, None, text))
+
+    return entries
+
+
+def format_return_entry(name, type_, descr):
+    """
+    Format a structured return value as a line of a Returns section.
+
+    Args:
+        name (str): Name of the returned value, or its type when unnamed.
+        type_ (str): Type of the returned value, if named.
+        descr (str): Description of the returned value.
+
+    Returns:
+        The line, in the form of a Google style Returns section.
+
+    """
+    if name and type_:
+        name = "{} ({})".format(name, type_)
+    if name and descr:
+        return "{}: {}".format(name, descr)
+    return name or descr
+
+
+def parse_rest_docstring(docstring):
+    """
+    Split a reST docstring into its sections.
+
+    Fields in REST_FIELD_KINDS, like ":param x:" or ":rtype:", make up the
+    sections. Text before the first field makes up the summary and
+    description, and lines after a field continue its body.
+
+    Args:
+        docstring (str): Docstring to split.
+
+    Returns:
+        DocstringNode with the sections of the docstring.
+
+    """
+    preamble = []
+    fields = []
+    for line in docstring.split("\n"):
+        text = line.strip()
+        matching = REST_FIELD_RE.match(text) if text.startswith(":") else None
+        if matching is not None and matching.group("tag") in REST_FIELD_KINDS:
+            fields.append([REST_FIELD_KINDS[matching.group("tag")], matching.group("arg"), matching.group("body")])
+        elif not fields:
+            preamble.append(line)
+        elif text:
+            fields[-1][2] = "{} {}".format(fields[-1][2], text) if fields[-1][2] else text
+
+    args = {}
+    types = {}
+    raises = []
+    returns = rtype = None
+    for kind, arg, body in fields:
+        if kind == "args" and arg:
+            type_, _, name = arg.rpartition(" ")
+            args[name] = (type_ or None, body)
+        elif kind == "type" and arg:
+            types[arg] = body
+        elif kind == "returns":
+            returns = body
+        elif kind == "rtype":
+            rtype = body
+        elif kind == "raises":
+            raises.append((arg, None, body))
+
+    output = DocstringNode()
+    if args:
+        output.args = [(name, types.get(name, type_), descr) for name, (type_, descr) in args.items()]
+    if returns is not None or rtype is not None:
+        output.returns = format_return_entry(rtype, None, returns)
+    if raises:
+        output.raises = raises
+
+    set_description(output, [val.strip() for val in "\n".join(preamble).split("\n\n") if val.strip()])
+    return output
+
+
+def set_description(output, paragraphs):
+    """
+    Fill the summary and description of a docstring from its paragraphs.
+
+    Args:
+        output (DocstringNode): Sections of the docstring, updated in place.
+        paragraphs (list): Paragraphs that are not part of any section.
+
+    """
+    if paragraphs:
+        output.summary = paragraphs[0]
+        output.description = " ".join(val.replace("\n", " ") for val in paragraphs[1:])
+
+
+# Docstring parsers by style, detect_docstring_style picks one for every file
+DOCSTRING_STYLES = {
+    "google": parse_google_docstring,
+    "numpy": parse_numpy_docstring,
+    "rest": parse_rest_docstring,
+}
+
+
+def docstring_memo_stats():
+    """
+    Report how well the parse_docstring memo works in this process.
+
+    Returns:
+        Dictionary with the number of hits and misses, and the current and
+        maximum number of memoized docstrings.
+
+    """
+    info = parse_docstring.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": info.maxsize}
+
+
+def parse_arg_lines(lines):
+    """
+    Parse the lines of an Args or Raises section into entries.
+
+    A line starts a new argument when it matches ARG_LINE_RE and is not
+    indented further than the first line. Any other line continues the
+    description of the previous argument.
+
+    Args:
+        lines (list): Lines of the section, without the header.
+
+    Returns:
+        List of (name, type, description) tuples. The type is None when it
+        is not given, and the name is None for text before the first argument.
+
+    """
+    entries = []
+    indent = None
+    for line in lines:
+        text = line.lstrip()
+        if not text:
+            continue
+        line_indent = len(line) - len(text)
+        if indent is None:
+            indent = line_indent
+        text = text.rstrip()
+
+        matching = ARG_LINE_RE.match(text) if line_indent <= indent else None
+        if matching is not None:
+            entries.append(matching.groups())
+        elif entries:
+            name, type_, descr = entries[-1]
+            entries[-1] = (name, type_, "{} {}".format(descr, text) if descr else text)
+        else:
+            entries.append((None, None, text))
+
+    return entries
+
+
+def escape_docstring(docstring):
+    """
+    Escape the characters of function documentation that Markdown would swallow.
+
+    Args:
+        docstring (str): Text to escape, may be None.
+
+    Returns:
+        The escaped docstring, or None.
+
+    """
+    if docstring:
+        docstring = docstring.replace("<", r"\<")
+        docstring = docstring.replace(">", r"\>")
+
+    return docstring
+
+
+class FastParseError(Exception):
+    """Raised when the fast scanner meets a construct it leaves to ast."""
+
+
+def fast_parse_module(source, style="google"):
+    """
+    Extract the documentation info of a module without building its syntax tree.
+
+    Scans the source once for strings, comments, brackets and the start of
+    every logical line, and only looks closer at the lines holding a top
+    level def or class, a def directly in a top level class, and the first
+    statement of each of those. The output is the same as parse_module
+    for valid code, but syntax errors are not detected.
+
+    Args:
+        source (bytes): Content of the python file.
+        style (str): Docstring style of the file, a key of DOCSTRING_STYLES.
+
+    Raises:
+        FastParseError: The source has a construct that needs ast, such as
+            tab indentation, a one-line body or a docstring made of
+            several string literals.
+
+    Returns:
+        ModuleNode with the documentation info for this module.
+
+    """
+    encoding, _ = tokenize.detect_encoding(BytesIO(source).readline)
+    try:
+        text = source.decode(encoding)
+    except UnicodeDecodeError:
+        raise FastParseError("undecodable source")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+
+    output = ModuleNode(style=style)
+
+    depth = 0
+    continued = False
+    # Node waiting for the first statement of its body, and the indent of its header
+    pending, pending_indent = output, -1
+    # Top level class whose body is being scanned, and the indent of that body
+    class_info, class_indent = None, None
+
+    for match in FAST_TOKEN_RE.finditer(text):
+        kind = match.lastgroup
+        if kind == "open":
+            depth += 1
+        elif kind == "close":
+            depth = max(depth - 1, 0)
+        elif kind == "cont":
+            continued = depth == 0
+        elif kind == "line" and depth == 0:
+            if continued:
+                continued = False
+                continue
+
+            indent = match.group("line")
+            if "\t" in indent or "\f" in indent:
+                raise FastParseError("tab indentation")
+            indent = len(indent)
+            pos = match.end()
+
+            if pending is not None:
+                if indent <= pending_indent:
+                    raise FastParseError("one-line body")
+                pending.docstring = fast_docstring(text, pos)
+                pending.doc = parse_docstring(pending.docstring, style)
+                pending = None
+
+            if indent == 0:
+                class_info = None
+            elif class_info is not None and class_indent is None:
+                class_indent = indent
+
+            header = FAST_HEADER_RE.match(text, pos)
+            if header is None or header.group("async"):
+                continue
+
+            if indent == 0 and header.group("kind") == "class":
+                pending = class_info = ClassNode(header.group("name"))
+                class_indent = None
+                output.classes.append(class_info)
+            elif indent == 0 or (class_info is not None and indent == class_indent):
+                if header.group("kind") == "class":
+                    continue
+                pending = FuncNode(header.group("name"))
+                parent = output if indent == 0 else class_info
+                parent.funcs.append(pending)
+            else:
+                continue
+            pending_indent = indent
+
+    if pending is not None and pending is not output:
+        raise FastParseError("missing body")
+
+    return output
+
+
+def fast_docstring(text, pos):
+    """
+    Read the docstring from the first statement of a body, if it is one.
+
+    Args:
+        text (str): Source of the module.
+        pos (int): Position of the first statement of the body.
+
+    Raises:
+        FastParseError: The statement starts like a docstring but is not
+            a single string literal.
+
+    Returns:
+        The cleaned docstring, or None if the statement is not a docstring.
+
+    """
+    match = FAST_DOCSTRING_RE.match(text, pos)
+    if match is None:
+        if text[pos] in "\"'(" or FAST_PREFIX_RE.match(text, pos):
+            raise FastParseError("complex docstring")
+        return None
+
+    prefix = match.group("prefix").lower()
+    if "b" in prefix or "f" in prefix:
+        return None
+
+    string = match.group("string")
+    quotes = 3 if string.startswith(("\"\"\"", "'''")) else 1
+    docstring = string[quotes:-quotes]
+    if "r" not in prefix and "\\" in docstring:
+        docstring = ast.literal_eval(string)
+
+    return inspect.cleandoc(docstring)
+
+
+class ParseCache:
+    """
+    Parse results of python files, addressed by content and persisted between runs.
+
+    Files map to the hash of their content, and each distinct content is
+    parsed only once, however many copies of it exist in the tree. The
+    modification time and size of a file are checked first, and its
+    content is only hashed when they differ, so unchanged files are
+    neither read nor parsed.
+
+    """
+
+    def __init__(self, cache_dir=None, fast=False):
+        """
+        Create the cache, loading previous results from cache_dir.
+
+        Args:
+            cache_dir (str): Directory holding the cache file. The cache
+                only lives in memory when this is None.
+            fast (bool): Whether new files are parsed with fast_parse_module
+                where possible.
+
+        """
+        self.cache_dir = cache_dir
+        self.fast = fast
+        self.files = {}
+        self.modules = {}
+        self.folders = {}
+        self.seen = set()
+        self.prune = True
+        self.dirty = False
+
+        if cache_dir is not None:
+            self.load()
+
+    def load(self):
+        """Load the entries saved by a previous run, discarding those of other builder versions."""
+        try:
+            with open(join(self.cache_dir, CACHE_FILENAME), "rb") as cache_file:
+                data = pickle.load(cache_file)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            # Entries pickled by a different copy of the builder can not be loaded
+            return
+
+        if (isinstance(data, dict) and data.get("version") == CACHE_VERSION
+                and data.get("builder") == builder_digest()):
+            self.files = data["files"]
+            self.modules = data["modules"]
+            self.folders = data["folders"]
+
+    def save(self):
+        """
+        Write the entries used in this run to disk, if anything changed.
+
+        Entries of files that were not looked up in this run are dropped,
+        unless prune was turned off because the tree was not read from the
+        python files.
+
+        """
+        if self.cache_dir is None:
+            return
+
+        stale = set(self.files) - self.seen if self.prune else set()
+        if not (self.dirty or stale):
+            return
+        for file_name in stale:
+            del self.files[file_name]
+        used = {digest for _, digest in self.files.values()}
+        self.modules = {digest: module for digest, module in self.modules.items() if digest in used}
+
+        makedirs(self.cache_dir, exist_ok=True)
+        cache_path = join(self.cache_dir, CACHE_FILENAME)
+        with open(cache_path + ".tmp", "wb") as cache_file:
+            data = {"version": CACHE_VERSION, "builder": builder_digest(), "files": self.files,
+                    "modules": self.modules, "folders": self.folders}
+            pickle.dump(data, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+        replace(cache_path + ".tmp", cache_path)
+        self.dirty = False
+
+    def set_folders(self, renderers, folders):
+        """
+        Record the folder hashes of the documentation that was just built.
+
+        The stat key of every documentation file is stored with the hashes
+        of its folder, so that files removed or rewritten by another run
+        are not mistaken for up to date ones.
+
+        Args:
+            renderers (list): Renderers of the formats that were built.
+            folders (dict): Output of folder_hashes.
+
+        """
+        for renderer in renderers:
+            outputs = {name: (own_hash, tree_hash, output_stat_key(join(name, renderer.filename)))
+                       for name, (own_hash, tree_hash) in folders.items()}
+            if outputs != self.folders.get(renderer.name):
+                self.folders[renderer.name] = outputs
+                self.dirty = True
+
+    def lookup(self, file_name):
+        """
+        Find the parse result for a file.
+
+        Args:
+            file_name (str): File name to look up.
+
+        Returns:
+            Tuple (content hash, source, module). module is None when this
+            content has not been parsed yet, and source is None when the
+            file did not have to be read.
+
+        """
+        self.seen.add(file_name)
+        entry = self.files.get(file_name)
+        stat_key = file_stat_key(file_name)
+        if entry is not None and entry[0] == stat_key and entry[1] in self.modules:
+            return entry[1], None, self.modules[entry[1]]
+
+        with profile_phase("read"):
+            with open(file_name, "rb") as file_:
+                source = file_.read()
+            digest = hashlib.sha1(source).hexdigest()
+        if PROFILER is not None:
+            PROFILER.add(bytes=len(source))
+
+        self.files[file_name] = (stat_key, digest)
+        self.dirty = True
+        return digest, source, self.modules.get(digest)
+
+    def parse(self, file_name):
+        """
+        Get the parse result for a file, parsing it only if its content is new.
+
+        Args:
+            file_name (str): File name to parse.
+
+        Returns:
+            Tuple of the content hash and the output of parse_module.
+
+        """
+        digest, source, module = self.lookup(file_name)
+        if module is None:
+            module = self.put(digest, parse_file_source(file_name, source, self.fast))
+
+        return digest, module
+
+    def put(self, digest, module):
+        """
+        Store the parse result for a content hash.
+
+        Args:
+            digest (str): Hash of the file content.
+            module (ModuleNode): Output of parse_module for that content.
+
+        Returns:
+            The stored parse result, which is the earlier one if another
+            copy of the content was stored first.
+
+        """
+        self.dirty = True
+        return self.modules.setdefault(digest, module)
+
+
+def dump_tree(file_info, file_name, binary=False):
+    """
+    Save the output of parse_folder, so it can be rendered without parsing.
+
+    The tree is written as the records of tree_records, preceded by a header
+    with IR_FORMAT, IR_VERSION and the root folder. The JSON Lines form has
+    the header and every record on a line of its own. The binary form is
+    IR_BINARY_MAGIC followed by the same lines compressed with zlib, so
+    both forms are safe to load from untrusted machines.
+
+    Args:
+        file_info (FolderNode): Directory info from parse_folder.
+        file_name (str): File to write.
+        binary (bool): Whether to write the binary form instead of JSON Lines.
+
+    """
+    header = {"format": IR_FORMAT, "version": IR_VERSION, "root": file_info.name}
+    lines = ("{}\n".format(json.dumps(record)).encode() for record in chain([header], tree_records(file_info)))
+
+    with open(file_name, "wb", buffering=STREAM_BUFFER_SIZE) as out_file:
+        if not binary:
+            out_file.writelines(lines)
+            return
+
+        out_file.write(IR_BINARY_MAGIC)
+        compressor = zlib.compressobj()
+        for line in lines:
+            out_file.write(compressor.compress(line))
+        out_file.write(compressor.flush())
+
+
+def load_tree(file_name, root=None):
+    """
+    Load a tree saved by dump_tree, in either form.
+
+    Args:
+        file_name (str): File to read.
+        root (str): Folder to move the tree to, it stays where it was
+            parsed when this is None.
+
+    Raises:
+        ValueError: The file is not a tree saved by dump_tree, was saved
+            with a different IR_VERSION, or has malformed records.
+
+    Returns:
+        FolderNode like the output of parse_folder, with the Merkle hashes.
+
+    """
+    # The tree holds no reference cycles, so collecting while it is built only wastes time
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        with open(file_name, "rb") as in_file:
+            if in_file.read(len(IR_BINARY_MAGIC)) == IR_BINARY_MAGIC:
+                try:
+                    lines = zlib.decompress(in_file.read()).splitlines()
+                except zlib.error:
+                    raise ValueError("{} is not a saved documentation tree".format(file_name))
+            else:
+                in_file.seek(0)
+                lines = in_file
+
+            lines = (line for line in lines if line.strip())
+            try:
+                header = json.loads(next(lines, b"null"))
+            except ValueError:
+                header = None
+            records = map(json.loads, lines)
+
+            if not isinstance(header, dict) or header.get("format") != IR_FORMAT:
+                raise ValueError("{} is not a saved documentation tree".format(file_name))
+            if header.get("version") != IR_VERSION:
+                raise ValueError("{} was saved with version {} of the format, expected {}".format(
+                    file_name, header.get("version"), IR_VERSION))
+
+            try:
+                return tree_from_records(records, header["root"] if root is None else root)
+            except ValueError as err:
+                raise ValueError("{} is not a valid saved documentation tree: {}".format(file_name, err))
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def tree_records(file_info):
+    """
+    Flatten a parsed tree into plain lists.
+
+    Every module is recorded once, before the first folder containing it,
+    as ["module", content hash, module record]. Folders are recorded parents
+    first, as ["folder", parent index, name, own hash, tree hash, files],
+    where the parent index counts folder records, the name of the root is
+    empty and files lists the [file name, content hash] of every file.
+
+    Args:
+        file_info (FolderNode): Directory info from parse_folder.
+
+    Returns:
+        Iterator over the records.
+
+    """
+    seen = set()
+    index = 0
+    stack = [(file_info, -1, "")]
+    while stack:
+        datum, parent, sub_name = stack.pop()
+        files = []
+        for file_name, file_node in datum.files.items():
+            if file_node.hash not in seen:
+                seen.add(file_node.hash)
+                yield ["module", file_node.hash, module_record(file_node.module)]
+            files.append([file_name, file_node.hash])
+
+        yield ["folder", parent, sub_name, datum.own_hash, datum.tree_hash, files]
+        stack.extend((sub_info, index, sub_name) for sub_name, sub_info in reversed(list(datum.folders.items())))
+        index += 1
+
+
+def tree_from_records(records, root):
+    """
+    Rebuild a parsed tree from the output of tree_records.
+
+    Args:
+        records (iterable): Records of the tree.
+        root (str): Path of the root folder.
+
+    Raises:
+        ValueError: A record is malformed, refers to a missing parent or
+            module, or has a folder or file name that would place files
+            outside the root.
+
+    Returns:
+        FolderNode of the root folder.
+
+    """
+    modules = {}
+    folders = []
+    for record in records:
+        if not isinstance(record, list) or not record or record[0] not in ("module", "folder"):
+            raise ValueError("unknown record {!r}".format(record))
+
+        if record[0] == "module":
+            if len(record) != 3 or not isinstance(record[1], str):
+                raise ValueError("malformed module record")
+            try:
+                modules[record[1]] = module_from_record(record[2])
+            except (TypeError, ValueError, IndexError, AttributeError):
+                raise ValueError("malformed module record {}".format(record[1]))
+            continue
+
+        if len(record) != 6:
+            raise ValueError("malformed folder record")
+        _, parent, sub_name, own_hash, tree_hash, files = record
+        # Only the first folder is the root, every other one comes after its parent
+        if not isinstance(parent, int) or not -1 <= parent < len(folders) or (parent < 0) != (not folders):
+            raise ValueError("folder {!r} has an invalid parent {!r}".format(sub_name, parent))
+        if not isinstance(files, list) or not all(
+                isinstance(entry, list) and len(entry) == 2 and isinstance(entry[1], str) and entry[1] in modules
+                for entry in files):
+            raise ValueError("folder {!r} lists files without a module record".format(sub_name))
+        if parent >= 0:
+            check_record_name(sub_name)
+        folder_name = join(folders[parent].name, sub_name) if parent >= 0 else root
+        datum = FolderNode(folder_name, {
+            check_record_name(file_name): FileNode(join(folder_name, file_name), digest, modules[digest])
+            for file_name, digest in files
+        })
+        datum.own_hash, datum.tree_hash = own_hash, tree_hash
+        if parent >= 0:
+            folders[parent].folders[sub_name] = datum
+        folders.append(datum)
+
+    if not folders:
+        raise ValueError("no folders")
+    return folders[0]
+
+
+def check_record_name(name):
+    """
+    Check that a folder or file name of a saved tree stays inside its parent folder.
+
+    Args:
+        name (str): Name from a folder record.
+
+    Raises:
+        ValueError: The name is empty, "." or "..", absolute, or has a path separator.
+
+    Returns:
+        The name.
+
+    """
+    if (not isinstance(name, str) or name in ("", ".", "..") or isabs(name) or sep in name
+            or (altsep is not None and altsep in name)):
+        raise ValueError("invalid name {!r}".format(name))
+    return name
+
+
+def module_record(module_info):
+    """
+    Flatten a ModuleNode into plain lists.
+
+    Args:
+        module_info (ModuleNode): Information about the module.
+
+    Returns:
+        [docstring, style, doc, classes, funcs], where every class is
+        [name, docstring, doc, funcs], every function [name, docstring, doc]
+        and every doc the output of doc_record.
+
+    """
+    return [
+        module_info.docstring,
+        module_info.style,
+        doc_record(module_info.doc),
+        [[class_info.name, class_info.docstring, doc_record(class_info.doc),
+          [[func_info.name, func_info.docstring, doc_record(func_info.doc)] for func_info in class_info.funcs]]
+         for class_info in module_info.classes],
+        [[func_info.name, func_info.docstring, doc_record(func_info.doc)] for func_info in module_info.funcs],
+    ]
+
+
+def module_from_record(record):
+    """
+    Rebuild a ModuleNode from the output of module_record.
+
+    Args:
+        record (list): The module record.
+
+    Returns:
+        ModuleNode with the documentation info of the module.
+
+    """
+    docstring, style, doc, classes, funcs = record
+    return ModuleNode(
+        docstring,
+        [ClassNode(name, class_docstring,
+                   [FuncNode(func[0], func[1], doc_from_record(func[2])) for func in class_funcs],
+                   doc_from_record(class_doc))
+         for name, class_docstring, class_doc, class_funcs in classes],
+        [FuncNode(func[0], func[1], doc_from_record(func[2])) for func in funcs],
+        doc_from_record(doc),
+        style,
+    )
+
+
+def doc_record(doc):
+    """
+    Flatten a DocstringNode into a plain list.
+
+    Args:
+        doc (DocstringNode): Sections of a docstring, may be None.
+
+    Returns:
+        [summary, description, args, returns, raises], or None without a docstring.
+
+    """
+    if doc is None:
+        return None
+    return [doc.summary, doc.description, doc.args, doc.returns, doc.raises]
+
+
+def doc_from_record(record):
+    """
+    Rebuild a DocstringNode from the output of doc_record.
+
+    Args:
+        record (list): The docstring record, may be None.
+
+    Returns:
+        DocstringNode with the sections of the docstring, or None. The
+        entries of its sections are lists instead of tuples when read from
+        JSON Lines.
+
+    """
+    if record is None:
+        return None
+    return DocstringNode(*record)
+
+
+def build_files(file_info, base_path, fragments=None, stream=False, stats=None, known_hashes=None,
+                renderers=None, render_jobs=1):
+    """
+    Actually build the documentation.
+
+    Documentation files whose content would not change are left untouched.
+    With the folder hashes of a previous run, unchanged subtrees are skipped
+    entirely and folders whose own hash is unchanged are not rendered.
+    Folders are visited with an explicit stack, so the depth of the tree
+    is not limited by the recursion limit.
+
+    Args:
+        file_info (FolderNode): All the directory info from earlier steps.
+        base_path (str): Path the module names are made relative to.
+        fragments (dict): Rendered file documentation by renderer name and
+            content hash, shared between all copies of the same file.
+        stream (bool): Whether to write every section to the file as soon
+            as it is rendered instead of rendering the whole document
+            first. Rendered files are not shared between copies then.
+        stats (Counter): Counts of "written" and "skipped" files to update.
+        known_hashes (dict): Folder hashes of the documentation already on
+            disk by renderer name, as recorded by ParseCache.set_folders.
+        renderers (list): Renderers of the documentation formats to write,
+            Markdown only when this is None.
+        render_jobs (int): Number of processes rendering folders while a
+            separate thread writes the results, see render_parallel.
+            Streaming always renders in this process.
+
+    Returns:
+        Counter with the number of written and skipped documentation files.
+
+    """
+    if fragments is None and not stream:
+        fragments = {}
+    if stats is None:
+        stats = Counter(written=0, skipped=0)
+    if known_hashes is None:
+        known_hashes = {}
+    if renderers is None:
+        renderers = [MarkdownRenderer()]
+
+    documents = iter_documents(file_info, base_path, known_hashes, renderers, stats)
+    if render_jobs > 1 and not stream:
+        render_parallel(documents, render_jobs, stats)
+        return stats
+
+    for renderer, datum, datum_base, output_name in documents:
+        written = write_document(renderer, datum, datum_base, output_name,
+                                 None if stream else fragments.setdefault(renderer.name, {}))
+        stats["written" if written else "skipped"] += 1
+
+    return stats
+
+
+def write_document(renderer, datum, base_path, output_name, fragments=None):
+    """
+    Render the documentation of one folder and write it unless it is unchanged.
+
+    Args:
+        renderer (MarkdownRenderer): Renderer of the documentation format.
+        datum (FolderNode): Directory info for the folder.
+        base_path (str): Path the module names are made relative to.
+        output_name (str): Documentation file to write.
+        fragments (dict): Rendered file documentation of this renderer by
+            content hash. Sections are streamed to the file when this is None.
+
+    Returns:
+        True if the file was written, False if it was already up to date.
+
+    """
+    sections = renderer.iter_folder(datum, base_path, fragments)
+    if fragments is None:
+        # Sections are rendered while they are written, so all of it counts as writing
+        with profile_phase("write"):
+            return write_sections_if_changed(output_name, sections)
+
+    with profile_phase("render"):
+        output_str = "".join(sections)
+    with profile_phase("write"):
+        return write_if_changed(output_name, output_str)
+
+
+def build_tree_bounded(folder_name, base_path, cache=None, fast=False, stream=False, stats=None,
+                       known_hashes=None, renderers=None):
+    """
+    Parse and document a folder tree one folder at a time, in bounded memory.
+
+    Every folder is parsed, rendered and written before its subdirectories
+    are visited, and only its name and hashes are kept afterwards. The
+    links to subdirectories are rendered from placeholder nodes holding
+    just their names. Peak memory is set by the largest folder instead of
+    the whole tree, apart from the parse results a persistent cache keeps.
+    The files written are the same as with parse_folder and build_files.
+
+    Args:
+        folder_name (str): Directory to document.
+        base_path (str): Path the module names are made relative to.
+        cache (ParseCache): Cache of parse results to reuse. A new in-memory
+            cache is used for every folder when this is None, so parse
+            results are not kept between folders.
+        fast (bool): Whether folders without a cache are parsed with
+            fast_parse_module where possible.
+        stream (bool): Whether to write every section to the file as soon
+            as it is rendered.
+        stats (Counter): Counts of "written" and "skipped" files to update.
+        known_hashes (dict): Folder hashes of the documentation already on
+            disk by renderer name, as recorded by ParseCache.set_folders.
+            Folders whose own hash and documentation file are unchanged are
+            not rendered.
+        renderers (list): Renderers of the documentation formats to write,
+            Markdown only when this is None.
+
+    Returns:
+        Tuple of the Counter with the number of written and skipped
+        documentation files and the folder hashes, like folder_hashes.
+
+    """
+    if stats is None:
+        stats = Counter(written=0, skipped=0)
+    if known_hashes is None:
+        known_hashes = {}
+    if renderers is None:
+        renderers = [MarkdownRenderer()]
+
+    builder_hash = builder_digest().encode()
+    hashes = {}
+    # Folders are pushed again with their subdirectory paths, to be hashed once those are done
+    stack = [(folder_name, base_path, None)]
+    while stack:
+        datum_name, datum_base, sub_paths = stack.pop()
+        if sub_paths is not None:
+            own_hash = hashes[datum_name]
+            hashes[datum_name] = (own_hash, folder_tree_hash(own_hash, [hashes[path][1] for path in sub_paths]))
+            continue
+
+        datum = parse_folder_files(datum_name, True, cache if cache is not None else ParseCache(fast=fast))
+        datum.folders = {sub_name: FolderNode(join(datum_name, sub_name)) for sub_name in datum.folders}
+        own_hash = hashes[datum_name] = folder_own_hash(datum, builder_hash)
+
+        for renderer in renderers:
+            output_name = join(datum_name, renderer.filename)
+            known_own, _, stat_key = known_hashes.get(renderer.name, {}).get(datum_name, (None, None, None))
+            if known_own == own_hash and is_output_current(output_name, stat_key):
+                stats["skipped"] += 1
+                continue
+            written = write_document(renderer, datum, datum_base, output_name, None if stream else {})
+            stats["written" if written else "skipped"] += 1
+
+        sub_paths = [sub_info.name for sub_info in datum.folders.values()]
+        stack.append((datum_name, datum_base, sub_paths))
+        stack.extend((path, datum_name, None) for path in reversed(sub_paths))
+        del datum
+
+    return stats, hashes
+
+
+def iter_documents(file_info, base_path, known_hashes, renderers, stats):
+    """
+    List the documentation files that have to be rendered, parents first.
+
+    Args:
+        file_info (FolderNode): All the directory info from earlier steps.
+        base_path (str): Path the module names are made relative to.
+        known_hashes (dict): Folder hashes of the documentation already on
+            disk by renderer name, as recorded by ParseCache.set_folders.
+        renderers (list): Renderers of the documentation formats to write.
+        stats (Counter): Counts to add the skipped files to.
+
+    Returns:
+        Iterator over (renderer, folder, base path, output file) tuples.
+
+    """
+    # Whether the documentation files are still the recorded ones, per folder and for whole
+    # subtrees, found once with children before their parents
+    current = {}
+    subtree_current = {}
+    for datum in reversed(list(iter_folders(file_info))):
+        for renderer in renderers:
+            stat_key = known_hashes.get(renderer.name, {}).get(datum.name, (None, None, None))[2]
+            current[datum.name, renderer.name] = is_output_current(join(datum.name, renderer.filename), stat_key)
+        subtree_current[datum.name] = (all(current[datum.name, renderer.name] for renderer in renderers)
+                                       and all(subtree_current[sub_info.name] for sub_info in datum.folders.values()))
+
+    stack = [(file_info, base_path)]
+    while stack:
+        datum, datum_base = stack.pop()
+
+        hashes = [known_hashes.get(renderer.name, {}).get(datum.name, (None, None, None))
+                  for renderer in renderers]
+        if (subtree_current[datum.name]
+                and all(tree_hash is not None and tree_hash == datum.tree_hash for _, tree_hash, _ in hashes)):
+            stats["skipped"] += count_folders(datum) * len(renderers)
+            continue
+
+        for renderer, (own_hash, _, _) in zip(renderers, hashes):
+            output_name = join(datum.name, renderer.filename)
+            if own_hash is not None and own_hash == datum.own_hash and current[datum.name, renderer.name]:
+                stats["skipped"] += 1
+                continue
+            yield renderer, datum, datum_base, output_name
+
+        # Create documentation for files in the subdirectories
+        stack.extend((sub_info, datum.name) for sub_info in reversed(list(datum.folders.values())))
+
+
+def render_parallel(documents, jobs, stats):
+    """
+    Render documentation files in a process pool and write them from a separate thread.
+
+    Each worker gets a chunk of folders stripped of their subtrees, so only
+    the modules of those folders are sent to it. Rendered documents come back
+    in order and are queued for the writer thread, so rendering the next
+    chunk overlaps with writing the previous one. Every document is rendered
+    by the same renderer as in build_files, so the files are identical.
+
+    Args:
+        documents (iterable): Output of iter_documents.
+        jobs (int): Number of rendering processes.
+        stats (Counter): Counts of "written" and "skipped" files to update.
+
+    """
+    documents = list(documents)
+    tasks = [(renderer, shallow_folder(datum), datum_base) for renderer, datum, datum_base, _ in documents]
+    chunksize = max(1, min(RENDER_CHUNK_LIMIT, len(tasks) // (jobs * 4)))
+    chunks = [tasks[ind:ind + chunksize] for ind in range(0, len(tasks), chunksize)]
+    output_names = (output_name for _, _, _, output_name in documents)
+
+    pending = Queue()
+    with ThreadPoolExecutor(max_workers=1) as writer_pool:
+        writer = writer_pool.submit(write_documents, pending, stats)
+        try:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                for texts in pool.map(render_folders, chunks):
+                    pending.put([(next(output_names), text) for text in texts])
+        finally:
+            pending.put(None)
+        writer.result()
+
+
+def shallow_folder(datum):
+    """
+    Copy a folder node without the contents of its subdirectories.
+
+    Args:
+        datum (FolderNode): Folder to copy.
+
+    Returns:
+        FolderNode with the same files and empty subdirectory nodes, which
+        is all a renderer reads.
+
+    """
+    return FolderNode(datum.name, datum.files,
+                      {sub_name: FolderNode(sub_info.name) for sub_name, sub_info in datum.folders.items()})
+
+
+def render_folders(tasks):
+    """
+    Render the documentation of several folders, sharing rendered files between them.
+
+    Args:
+        tasks (list): (renderer, folder, base path) tuples.
+
+    Returns:
+        List with the content of every documentation file.
+
+    """
+    fragments = {}
+    return ["".join(renderer.iter_folder(datum, datum_base, fragments.setdefault(renderer.name, {})))
+            for renderer, datum, datum_base in tasks]
+
+
+def write_documents(pending, stats):
+    """
+    Write rendered documentation files from a queue until it yields None.
+
+    Args:
+        pending (Queue): Lists of (file name, content) pairs.
+        stats (Counter): Counts of "written" and "skipped" files to update.
+
+    """
+    for documents in iter(pending.get, None):
+        for output_name, output_str in documents:
+            with profile_phase("write"):
+                written = write_if_changed(output_name, output_str)
+            stats["written" if written else "skipped"] += 1
+
+
+def write_if_changed(file_name, output_str):
+    """
+    Write a documentation file unless it already has this content.
+
+    Args:
+        file_name (str): File to write.
+        output_str (str): New content of the file.
+
+    Returns:
+        True if the file was written, False if it was already up to date.
+
+    """
+    if file_digest(file_name) == hashlib.sha1(output_str.encode("utf-8", OUTPUT_ERRORS)).hexdigest():
+        return False
+
+    with open(file_name, 'w', encoding="utf-8", errors=OUTPUT_ERRORS) as out_file:
+        out_file.write(output_str)
+    return True
+
+
+def write_sections_if_changed(file_name, sections):
+    """
+    Stream sections to a documentation file unless it already has this content.
+
+    The sections are written to a temporary file next to the target, which
+    replaces the target only if the content hashes differ.
+
+    Args:
+        file_name (str): File to write.
+        sections (iterable): Strings making up the new content.
+
+    Returns:
+        True if the file was written, False if it was already up to date.
+
+    """
+    new_hash = hashlib.sha1()
+    tmp_name = file_name + ".tmp"
+    with open(tmp_name, 'w', encoding="utf-8", errors=OUTPUT_ERRORS, buffering=STREAM_BUFFER_SIZE) as out_file:
+        for section in sections:
+            out_file.write(section)
+            new_hash.update(section.encode("utf-8", OUTPUT_ERRORS))
+
+    if file_digest(file_name) == new_hash.hexdigest():
+        remove(tmp_name)
+        return False
+
+    replace(tmp_name, file_name)
+    return True
+
+
+def file_digest(file_name):
+    """
+    Hash the text content of a documentation file, read as UTF-8 like it is written.
+
+    Args:
+        file_name (str): File to hash.
+
+    Returns:
+        Hex digest of the file content, or None if the file does not exist.
+        Bytes that are not UTF-8 are replaced, so such files never match.
+
+    """
+    digest = hashlib.sha1()
+    try:
+        with open(file_name, encoding="utf-8", errors="replace") as in_file:
+            for chunk in iter(lambda: in_file.read(STREAM_BUFFER_SIZE), ""):
+                digest.update(chunk.encode())
+    except FileNotFoundError:
+        return None
+
+    return digest.hexdigest()
+
+
+def iter_docs_folder(file_info, base_path, fragments=None):
+    """
+    Render the documentation of a folder section by section.
+
+    Args:
+        file_info (FolderNode): Directory info for this folder.
+        base_path (str): Path the module names are made relative to.
+        fragments (dict): Rendered file documentation by content hash. Every
+            function and class is yielded separately when this is None.
+
+    Returns:
+        Iterator over the sections of the folder's documentation.
+
+    """
+    # Build header
+    yield "# Module: `{}`\n".format(folder_title(file_info, base_path))
+
+    for file_name in ordered_files(file_info):
+        # Document files in the folder
+        datum = file_info.files[file_name]
+
+        yield "## File: `{}`\n".format(file_name)
+
+        if fragments is None:
+            yield from iter_docs_module(datum.module)
+        else:
+            yield file_fragment(datum, fragments, build_docs_module)
+
+    if file_info.folders:
+        yield "## Subdirectory Links:\n"
+        for folder_name, subdir_link in subfolder_links(file_info, base_path, OUTPUT_FILENAME):
+            # Add Subdir links
+            yield "- [{folder_name}]({link})\n".format(
+                folder_name=folder_name,
+                link=subdir_link
+            )
+
+
+def folder_title(file_info, base_path):
+    """
+    Name a folder in the header of its documentation.
+
+    Args:
+        file_info (FolderNode): Directory info for this folder.
+        base_path (str): Path the module names are made relative to.
+
+    Returns:
+        The folder name relative to base_path.
+
+    """
+    module_name = file_info.name.replace(base_path, "")
+    if "\\" in module_name:
+        module_name = module_name.replace("\\", "")
+    if not module_name:
+        module_name = "Base Directory"
+    return module_name
+
+
+def ordered_files(file_info):
+    """
+    List the python files of a folder in the order they are documented.
+
+    Args:
+        file_info (FolderNode): Directory info for this folder.
+
+    Returns:
+        List of file names, with __init__.py first.
+
+    """
+    # Make sure that the __init__.py is at the front
+    file_names = list(file_info.files)
+    if "__init__.py" in file_info.files:
+        file_names.remove("__init__.py")
+        file_names.insert(0, "__init__.py")
+    return file_names
+
+
+def file_fragment(datum, fragments, build):
+    """
+    Render the documentation of a file, sharing it between identical files.
+
+    Args:
+        datum (FileNode): The file to render.
+        fragments (dict): Rendered file documentation by content hash,
+            None to always render.
+        build (callable): Renders the ModuleNode of the file to a string.
+
+    Returns:
+        String with the documentation of the file.
+
+    """
+    if fragments is None:
+        return build(datum.module)
+
+    # Identical files render identically, so only the first copy is rendered
+    fragment = fragments.get(datum.hash)
+    if fragment is None:
+        fragment = fragments[datum.hash] = build(datum.module)
+    return fragment
+
+
+def subfolder_links(file_info, base_path, filename):
+    """
+    Link the documentation of a folder to that of its subdirectories.
+
+    Args:
+        file_info (FolderNode): Directory info for this folder.
+        base_path (str): Path the folder names are made relative to.
+        filename (str): Name of the documentation file in every folder.
+
+    Returns:
+        Iterator over (folder name, relative link) of every subdirectory.
+
+    """
+    for datum in file_info.folders.values():
+        subdir_link = join(datum.name.replace(file_info.name, ""), filename).replace("\\", "/")
+        if subdir_link.startswith("/"):
+            subdir_link = subdir_link[1:]
+        yield datum.name.replace(base_path, ""), subdir_link
+
+
+def build_docs_module(module_info):
+    """
+    Build documentation for the contents of a file.
+
+    Args:
+        module_info (ModuleNode): Information about this module.
+
+    Returns:
+        String with the documentation of the module docstring, functions and classes.
+
+    """
+    return "".join(iter_docs_module(module_info))
+
+
+def iter_docs_module(module_info):
+    """
+    Render the documentation for the contents of a file section by section.
+
+    Args:
+        module_info (ModuleNode): Information about this module.
+
+    Returns:
+        Iterator over the module docstring, function and class sections.
+
+    """
+    if module_info.docstring:
+        yield "{}\n".format(module_info.docstring)
+
+    for func_child in module_info.funcs:
+        yield build_docs_func(func_child)
+
+    for class_child in module_info.classes:
+        yield from iter_docs_class(class_child)
+
+
+def build_docs_func(func_info):
+    """
+    Build documentation for a function.
+    
+    Args:
+        func_info (FuncNode): Information about this function.
+
+    """
+    out = ["### Function: `{}`\n".format(func_info.name)]
+
+    doc = func_info.doc
+    if doc is not None:
+
+        # Build function description 
+        if doc.summary is not None:
+            out.append("{}\n".format(escape_docstring(doc.summary)))
+            if doc.description:
+                out.append("\n#### Description\n{}\n".format(escape_docstring(doc.description)))
+
+        # Build documentation for Arguments
+        out.append("#### Arguments:")
+        if doc.args is not None:
+            build_docs_entries(doc.args, out)
+        else:
+            out.append("\n_None_\n")
+
+        # Build documentation for Returns
+        out.append("#### Returns:\n")
+        if doc.returns is not None:
+            out.append("{}\n".format(escape_docstring(doc.returns)))
+        else:
+            out.append("_None_\n")
+
+        # Build documentation for Exceptions, only documented when raised
+        if doc.raises is not None:
+            out.append("#### Raises:")
+            build_docs_entries(doc.raises, out)
+
+    out.append("\n")
+    return "".join(out)
+
+
+def build_docs_entries(entries, out):
+    """
+    Build the list of entries of an Args or Raises section.
+
+    Args:
+        entries (list): Output of parse_arg_lines.
+        out (list): Rendered pieces to append to.
+
+    """
+    for name, type_, descr in entries:
+        if name is None:
+            out.append(" {descr_cont}".format(descr_cont=escape_docstring(descr)))
+            continue
+        # Escaped so that *args and **kwargs do not start emphasis
+        out.append("\n- {name}".format(name=name.replace("*", r"\*")))
+        if type_ is not None:
+            out.append("\n  - Type: {type}".format(type=escape_docstring(type_)))
+        if descr:
+            out.append("\n  - {descr}".format(descr=escape_docstring(descr)))
+    out.append("\n")
+
+
+def build_docs_class(class_info):
+    """
+    Build documentation for a class.
+    
+    Args:
+        class_info (ClassNode): Information about this class.
+
+    """
+    return "".join(iter_docs_class(class_info))
+
+
+def iter_docs_class(class_info):
+    """
+    Render the documentation for a class section by section.
+
+    Args:
+        class_info (ClassNode): Information about this class.
+
+    Returns:
+        Iterator over the class header and its method sections.
+
+    """
+    out_str = "### Class: `{}`\n".format(class_info.name)
+
+    if class_info.docstring:
+        out_str = "{}{}\n".format(out_str, class_info.docstring)
+    yield out_str
+
+    for func_child in class_info.funcs:
+        yield build_docs_func(func_child)
+
+
+class MarkdownRenderer:
+    """Render documentation as Markdown, the default format."""
+
+    name = "markdown"
+    filename = OUTPUT_FILENAME
+
+    def iter_folder(self, file_info, base_path, fragments=None):
+        """
+        Render the documentation of a folder section by section.
+
+        Args:
+            file_info (FolderNode): Directory info for this folder.
+            base_path (str): Path the module names are made relative to.
+            fragments (dict): Rendered file documentation by content hash,
+                None to render every function and class separately.
+
+        Returns:
+            Iterator over the sections of the folder's documentation.
+
+        """
+        return iter_docs_folder(file_info, base_path, fragments)
+
+
+class HtmlRenderer:
+    """Render documentation as standalone HTML pages."""
+
+    name = "html"
+    filename = "DOCUMENTATION.html"
+
+    def iter_folder(self, file_info, base_path, fragments=None):
+        """
+        Render the documentation of a folder section by section.
+
+        Args:
+            file_info (FolderNode): Directory info for this folder.
+            base_path (str): Path the module names are made relative to.
+            fragments (dict): Rendered file documentation by content hash,
+                None to render every file again.
+
+        Returns:
+            Iterator over the sections of the folder's documentation.
+
+        """
+        title = html.escape(folder_title(file_info, base_path))
+        yield ("<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n<title>Module: {0}</title>\n"
+               "</head>\n<body>\n<h1>Module: <code>{0}</code></h1>\n").format(title)
+
+        for file_name in ordered_files(file_info):
+            yield "<h2>File: <code>{}</code></h2>\n".format(html.escape(file_name))
+            yield file_fragment(file_info.files[file_name], fragments, self.build_module)
+
+        links = list(subfolder_links(file_info, base_path, self.filename))
+        if links:
+            yield "<h2>Subdirectory Links:</h2>\n<ul>\n"
+            for folder_name, link in links:
+                yield "<li><a href=\"{}\">{}</a></li>\n".format(html.escape(link), html.escape(folder_name))
+            yield "</ul>\n"
+
+        yield "</body>\n</html>\n"
+
+    def build_module(self, module_info):
+        """
+        Build documentation for the contents of a file.
+
+        Args:
+            module_info (ModuleNode): Information about this module.
+
+        Returns:
+            String with the documentation of the module docstring, functions and classes.
+
+        """
+        out = [self.build_paragraphs(module_info.docstring)]
+        out.extend(self.build_func(func_child) for func_child in module_info.funcs)
+        for class_child in module_info.classes:
+            out.append("<h3>Class: <code>{}</code></h3>\n".format(class_child.name))
+            out.append(self.build_paragraphs(class_child.docstring))
+            out.extend(self.build_func(func_child) for func_child in class_child.funcs)
+        return "".join(out)
+
+    def build_func(self, func_info):
+        """
+        Build documentation for a function.
+
+        Args:
+            func_info (FuncNode): Information about this function.
+
+        Returns:
+            String with the documentation of the function.
+
+        """
+        out = ["<h3>Function: <code>{}</code></h3>\n".format(func_info.name)]
+
+        doc = func_info.doc
+        if doc is not None:
+            if doc.summary is not None:
+                out.append("<p>{}</p>\n".format(html.escape(doc.summary, quote=False)))
+                if doc.description:
+                    out.append("<h4>Description</h4>\n<p>{}</p>\n".format(html.escape(doc.description, quote=False)))
+
+            out.append("<h4>Arguments:</h4>\n")
+            out.append(self.build_entries(doc.args) if doc.args is not None else "<p><em>None</em></p>\n")
+
+            out.append("<h4>Returns:</h4>\n")
+            if doc.returns is not None:
+                out.append("<p>{}</p>\n".format(html.escape(doc.returns, quote=False)))
+            else:
+                out.append("<p><em>None</em></p>\n")
+
+            if doc.raises is not None:
+                out.append("<h4>Raises:</h4>\n")
+                out.append(self.build_entries(doc.raises))
+
+        return "".join(out)
+
+    def build_entries(self, entries):
+        """
+        Build the list of entries of an Args or Raises section.
+
+        Args:
+            entries (list): Output of parse_arg_lines.
+
+        Returns:
+            String with the HTML list.
+
+        """
+        out = ["<ul>\n"]
+        for name, type_, descr in entries:
+            if name is None:
+                out.append("<li>{}</li>\n".format(html.escape(descr, quote=False)))
+                continue
+            out.append("<li>{}<ul>".format(html.escape(name, quote=False)))
+            if type_ is not None:
+                out.append("<li>Type: {}</li>".format(html.escape(type_, quote=False)))
+            if descr:
+                out.append("<li>{}</li>".format(html.escape(descr, quote=False)))
+            out.append("</ul></li>\n")
+        out.append("</ul>\n")
+        return "".join(out)
+
+    def build_paragraphs(self, text):
+        """
+        Build HTML paragraphs from a module or class docstring.
+
+        Args:
+            text (str): Docstring, may be None.
+
+        Returns:
+            String with one paragraph per block of the docstring.
+
+        """
+        if not text:
+            return ""
+        return "".join("<p>{}</p>\n".format(html.escape(block.strip(), quote=False))
+                       for block in text.split("\n\n") if block.strip())
+
+
+class JsonRenderer:
+    """Render documentation as one JSON document per folder, for indexing."""
+
+    name = "json"
+    filename = "DOCUMENTATION.json"
+
+    def iter_folder(self, file_info, base_path, fragments=None):
+        """
+        Render the documentation of a folder section by section.
+
+        Args:
+            file_info (FolderNode): Directory info for this folder.
+            base_path (str): Path the module names are made relative to.
+            fragments (dict): Rendered file documentation by content hash,
+                None to render every file again.
+
+        Returns:
+            Iterator over the sections of the folder's documentation.
+
+        """
+        yield "{{\"module\": {}, \"files\": [".format(json.dumps(folder_title(file_info, base_path)))
+
+        for ind, file_name in enumerate(ordered_files(file_info)):
+            yield "{}{{\"name\": {}, \"content\": ".format(", " if ind else "", json.dumps(file_name))
+            yield file_fragment(file_info.files[file_name], fragments, self.build_module)
+            yield "}"
+
+        links = [{"name": folder_name, "link": link}
+                 for folder_name, link in subfolder_links(file_info, base_path, self.filename)]
+        yield "], \"subdirectories\": {}}}\n".format(json.dumps(links))
+
+    def build_module(self, module_info):
+        """
+        Build documentation for the contents of a file.
+
+        Args:
+            module_info (ModuleNode): Information about this module.
+
+        Returns:
+            String with the JSON object of the module.
+
+        """
+        return json.dumps({
+            "docstring": module_info.docstring,
+            "style": module_info.style,
+            "doc": self.doc_data(module_info.doc),
+            "funcs": [self.func_data(func_child) for func_child in module_info.funcs],
+            "classes": [{
+                "name": class_child.name,
+                "docstring": class_child.docstring,
+                "doc": self.doc_data(class_child.doc),
+                "funcs": [self.func_data(func_child) for func_child in class_child.funcs],
+            } for class_child in module_info.classes],
+        })
+
+    def func_data(self, func_info):
+        """
+        Collect the documentation of a function.
+
+        Args:
+            func_info (FuncNode): Information about this function.
+
+        Returns:
+            Dictionary with the name, docstring and sections of the function.
+
+        """
+        return {"name": func_info.name, "docstring": func_info.docstring, "doc": self.doc_data(func_info.doc)}
+
+    def doc_data(self, doc):
+        """
+        Collect the sections of a docstring.
+
+        Args:
+            doc (DocstringNode): Sections of the docstring, may be None.
+
+        Returns:
+            Dictionary of the sections, or None without a docstring.
+
+        """
+        if doc is None:
+            return None
+
+        return {"summary": doc.summary, "description": doc.description, "args": self.entries_data(doc.args),
+                "returns": doc.returns, "raises": self.entries_data(doc.raises)}
+
+    def entries_data(self, entries):
+        """
+        Collect the entries of an Args or Raises section.
+
+        Args:
+            entries (list): Output of parse_arg_lines, may be None.
+
+        Returns:
+            List of dictionaries with the name, type and description of
+            every entry, or None without the section.
+
+        """
+        if entries is None:
+            return None
+        return [{"name": name, "type": type_, "description": descr} for name, type_, descr in entries]
+
+
+# Documentation formats by name, every renderer writes its own file in every folder
+RENDERERS = {
+    "markdown": MarkdownRenderer,
+    "html": HtmlRenderer,
+    "json": JsonRenderer,
+}
+
+
+def watch_folder(file_info, base_path, cache, stream=False, interval=1.0, debounce=0.2, renderers=None):
+    """
+    Regenerate documentation whenever python files in the tree change.
+
+    Uses inotify on Linux and polls the tree otherwise, or once a folder
+    can not be watched with inotify. Bursts of changes
+    are coalesced, then only the folders that changed are listed and
+    reparsed, and only documentation whose content changed is rendered.
+    Runs until interrupted.
+
+    Args:
+        file_info (FolderNode): Directory info from parse_folder, kept up to date.
+        base_path (str): Path the module names are made relative to.
+        cache (ParseCache): Cache of parse results to reuse.
+        stream (bool): Whether to write documentation section by section.
+        interval (float): Seconds between checks when polling.
+        debounce (float): Seconds without changes before regenerating.
+        renderers (list): Renderers of the documentation formats to write,
+            Markdown only when this is None.
+
+    Returns:
+        Counter with the number of written and skipped documentation files.
+
+    """
+    if renderers is None:
+        renderers = [MarkdownRenderer()]
+
+    try:
+        watcher = InotifyWatcher(file_info.name)
+    except OSError:
+        watcher = PollingWatcher(file_info.name, interval)
+
+    stats = Counter(written=0, skipped=0)
+    try:
+        while True:
+            try:
+                changed = watcher.wait(debounce)
+            except OSError as err:
+                # New folders could not be watched, poll instead and refresh everything once
+                print("Watching with inotify failed ({}), polling instead.".format(err))
+                watcher.close()
+                watcher = PollingWatcher(file_info.name, interval)
+                changed = set(folder_nodes(file_info))
+            nodes = folder_nodes(file_info)
+            changed = sorted(folder for folder in changed if folder in nodes)
+            if not changed:
+                continue
+
+            known_hashes = dict(cache.folders)
+            for folder in changed:
+                if not isdir(folder):
+                    # Removed, its parent drops it from the tree
+                    continue
+                try:
+                    refresh_folder(nodes[folder], cache)
+                except (SyntaxError, OSError) as err:
+                    print("Could not update {}: {}".format(folder, err))
+
+            hash_folder(file_info)
+            update = build_files(file_info, base_path, stream=stream, known_hashes=known_hashes,
+                                 renderers=renderers)
+            cache.set_folders(renderers, folder_hashes(file_info))
+            cache.save()
+
+            stats.update(update)
+            print("Changed {}: wrote {written} documentation files, skipped {skipped} unchanged.".format(
+                ", ".join(changed), **update))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+    return stats
+
+
+def refresh_folder(file_info, cache):
+    """
+    Bring the parsed info of a single folder up to date with the disk.
+
+    Files are reparsed through the cache, so only files that changed are
+    read again. New subdirectories are walked, removed ones are dropped.
+
+    Args:
+        file_info (FolderNode): Directory info for the folder, updated in place.
+        cache (ParseCache): Cache of parse results to reuse.
+
+    """
+    folder_name = file_info.name
+    files, folders = scan_folder(folder_name)
+
+    # Parse everything first, so that a file with a syntax error leaves the folder as it was
+    parsed = {file_name: parse_file(join(folder_name, file_name), cache) for file_name in files}
+    walked = {
+        sub_name: file_info.folders.get(sub_name) or walk_folder(join(folder_name, sub_name), True, cache)
+        for sub_name in folders
+    }
+
+    file_info.files = parsed
+    file_info.folders = walked
+
+
+def folder_nodes(file_info):
+    """
+    Index a folder and all its subdirectories by name.
+
+    Args:
+        file_info (FolderNode): Directory info from parse_folder.
+
+    Returns:
+        Dictionary of folder name to directory info.
+
+    """
+    return {datum.name: datum for datum in iter_folders(file_info)}
+
+
+class InotifyWatcher:
+    """Report changed folders of a tree using Linux inotify."""
+
+    def __init__(self, folder_name):
+        """
+        Start watching every folder of a tree.
+
+        Args:
+            folder_name (str): Root of the tree to watch.
+
+        """
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux")
+
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self.libc.inotify_init1(O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.root = folder_name
+        self.watches = {}
+        try:
+            self.add_tree(folder_name)
+        except OSError:
+            self.close()
+            raise
+
+    def add_tree(self, folder_name):
+        """
+        Watch a folder and all its subdirectories.
+
+        Folders removed before they could be watched are skipped.
+
+        Args:
+            folder_name (str): Root of the tree to watch.
+
+        Raises:
+            OSError: If a folder can not be watched, for example when the
+                limit of inotify watches is reached.
+
+        """
+        stack = [folder_name]
+        while stack:
+            folder_name = stack.pop()
+            watch = self.libc.inotify_add_watch(self.fd, fsencode(folder_name), INOTIFY_MASK)
+            if watch < 0:
+                error = ctypes.get_errno()
+                if error == errno.ENOENT:
+                    continue
+                raise OSError(error, "inotify_add_watch failed: {}".format(strerror(error)), folder_name)
+
+            self.watches[watch] = folder_name
+            try:
+                stack.extend(join(folder_name, sub_name) for sub_name in scan_folder(folder_name)[1])
+            except FileNotFoundError:
+                continue
+
+    def wait(self, debounce):
+        """
+        Block until something changes, then collect events until it is quiet.
+
+        When the kernel event queue overflowed, events were lost, so the
+        whole tree is watched again and every folder is reported.
+
+        Args:
+            debounce (float): Seconds without events that end a burst.
+
+        Returns:
+            Set of names of the folders whose listing or python files changed.
+
+        """
+        changed = set()
+        overflow = False
+        timeout = None
+        while select.select([self.fd], [], [], timeout)[0]:
+            timeout = debounce
+            buffer = read(self.fd, 1 << 16)
+            offset = 0
+            while offset < len(buffer):
+                watch, mask, _, length = INOTIFY_EVENT.unpack_from(buffer, offset)
+                offset += INOTIFY_EVENT.size
+                name = fsdecode(buffer[offset:offset + length].rstrip(b"\0"))
+                offset += length
+
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+                folder_name = self.watches.get(watch)
+                if folder_name is None:
+                    continue
+                if mask & IN_IGNORED:
+                    del self.watches[watch]
+                elif mask & IN_ISDIR:
+                    if name in IGNORE_FOLDERS:
+                        continue
+                    changed.add(folder_name)
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        self.add_tree(join(folder_name, name))
+                elif name.endswith(".py"):
+                    changed.add(folder_name)
+
+        if overflow:
+            self.add_tree(self.root)
+            changed.update(self.watches.values())
+        return changed
+
+    def close(self):
+        """Stop watching."""
+        close(self.fd)
+
+
+class PollingWatcher:
+    """Report changed folders of a tree by comparing periodic snapshots."""
+
+    def __init__(self, folder_name, interval):
+        """
+        Take the first snapshot of a tree.
+
+        Args:
+            folder_name (str): Root of the tree to watch.
+            interval (float): Seconds between snapshots.
+
+        """
+        self.folder_name = folder_name
+        self.interval = interval
+        self.snapshot = self.take_snapshot()
+
+    def take_snapshot(self):
+        """
+        List the folders and python files of the tree with their stat keys.
+
+        Returns:
+            Dictionary of folder name to its subdirectories and file stat keys.
+
+        """
+        output = {}
+        stack = [self.folder_name]
+        while stack:
+            folder_name = stack.pop()
+            try:
+                files, folders = scan_folder(folder_name)
+                file_keys = tuple((file_name, file_stat_key(join(folder_name, file_name)))
+                                  for file_name in files)
+            except OSError:
+                continue
+            output[folder_name] = (tuple(folders), file_keys)
+            stack.extend(join(folder_name, sub_name) for sub_name in folders)
+
+        return output
+
+    def wait(self, debounce):
+        """
+        Block until something changes, then poll until the tree is stable.
+
+        Args:
+            debounce (float): Seconds the tree has to stay unchanged.
+
+        Returns:
+            Set of names of the folders whose listing or python files changed.
+
+        """
+        changed = set()
+        delay = self.interval
+        while True:
+            time.sleep(delay)
+            snapshot = self.take_snapshot()
+            diff = {folder_name for folder_name in set(snapshot) | set(self.snapshot)
+                    if snapshot.get(folder_name) != self.snapshot.get(folder_name)}
+            self.snapshot = snapshot
+            if diff:
+                changed |= diff
+                delay = debounce
+            elif changed:
+                return changed
+
+    def close(self):
+        """Stop watching."""
+
+
+class Profiler:
+    """
+    Wall and CPU time spent in each phase of a run, with counts of what was processed.
+
+    Phases are timed where they run, through profile_phase. CPU time is
+    measured per thread, so phases running in several walker threads add
+    up. Work done in worker processes with jobs or render_jobs is not seen.
+
+    """
+
+    def __init__(self):
+        """Create an empty profile."""
+        self.wall = Counter()
+        self.cpu = Counter()
+        self.calls = Counter()
+        self.counts = Counter()
+        self.file_times = {}
+        self.total_wall = 0.0
+        self.total_cpu = 0.0
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name, file_name=None):
+        """
+        Time the code run inside this context as part of a phase.
+
+        Args:
+            name (str): Phase name, one of PROFILE_PHASES.
+            file_name (str): File the time is spent on, recorded as its
+                parse time, if any.
+
+        """
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.thread_time() - cpu
+            with self.lock:
+                self.wall[name] += wall
+                self.cpu[name] += cpu
+                self.calls[name] += 1
+                if file_name is not None:
+                    self.file_times[file_name] = wall
+
+    def timed(self, name, func):
+        """
+        Wrap a function to time every call as part of a phase.
+
+        Args:
+            name (str): Phase name, one of PROFILE_PHASES.
+            func (callable): Function to wrap.
+
+        Returns:
+            The wrapped function.
+
+        """
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.phase(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    def add(self, **counts):
+        """
+        Add to the counts of processed items.
+
+        Args:
+            counts (int): Amount to add, by count name.
+
+        """
+        with self.lock:
+            self.counts.update(counts)
+
+    def count_folder(self, datum):
+        """
+        Count a parsed folder with its files, classes and functions.
+
+        Args:
+            datum (FolderNode): Folder with parsed files.
+
+        """
+        modules = [file_node.module for file_node in datum.files.values()]
+        self.add(folders=1, files=len(modules), classes=sum(len(module.classes) for module in modules),
+                 functions=sum(len(module.funcs) + sum(len(class_info.funcs) for class_info in module.classes)
+                               for module in modules))
+
+    def summary(self, slowest=PROFILE_SLOWEST_FILES):
+        """
+        Format the profile as a table.
+
+        Args:
+            slowest (int): Number of files with the longest parse times to list.
+
+        Returns:
+            Multi-line string with the time of every phase, the counts and
+            the slowest files.
+
+        """
+        lines = ["{:<12}{:>8}{:>10}{:>10}{:>8}".format("Phase", "Calls", "Wall s", "CPU s", "Wall %")]
+        for name in PROFILE_PHASES:
+            share = 100 * self.wall[name] / self.total_wall if self.total_wall else 0.0
+            lines.append("{:<12}{:>8}{:>10.4f}{:>10.4f}{:>7.1f}%".format(
+                name, self.calls[name], self.wall[name], self.cpu[name], share))
+        lines.append("{:<12}{:>8}{:>10.4f}{:>10.4f}".format("total", "", self.total_wall, self.total_cpu))
+        lines.append("Docstrings are split while parsing, so their time is part of parse.")
+        lines.append("Counted {folders} folders, {files} files, {classes} classes, {functions} functions, "
+                     "{bytes} bytes read.".format(**{name: self.counts[name] for name in PROFILE_COUNTS}))
+
+        if self.file_times and slowest:
+            lines.append("Slowest files to parse:")
+            ranked = sorted(self.file_times.items(), key=lambda item: item[1], reverse=True)
+            lines.extend("{:>10.4f}s  {}".format(seconds, file_name) for file_name, seconds in ranked[:slowest])
+        return "\n".join(lines)
+
+
+@contextmanager
+def profiling(profiler, stats_file=None):
+    """
+    Profile the code run inside this context.
+
+    The docstring parsers in DOCSTRING_STYLES are wrapped to time them and
+    restored afterwards. Only parses that miss the parse_docstring memo
+    reach them.
+
+    Args:
+        profiler (Profiler): Profile to record into.
+        stats_file (str): File to save cProfile statistics to for pstats,
+            if any.
+
+    """
+    global PROFILER
+
+    parsers = dict(DOCSTRING_STYLES)
+    for style, parser in parsers.items():
+        DOCSTRING_STYLES[style] = profiler.timed("docstrings", parser)
+    c_profile = cProfile.Profile() if stats_file is not None else None
+
+    PROFILER = profiler
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    if c_profile is not None:
+        c_profile.enable()
+    try:
+        yield profiler
+    finally:
+        if c_profile is not None:
+            c_profile.disable()
+            c_profile.dump_stats(stats_file)
+        profiler.total_wall += time.perf_counter() - wall
+        profiler.total_cpu += time.process_time() - cpu
+        PROFILER = None
+        DOCSTRING_STYLES.update(parsers)
+
+
+def profile_phase(name, file_name=None):
+    """
+    Time a phase of the run with the active profiler, if any.
+
+    Args:
+        name (str): Phase name, one of PROFILE_PHASES.
+        file_name (str): File the time is spent on, if any.
+
+    Returns:
+        Context manager timing the code inside it, which does nothing
+        while profiling is off.
+
+    """
+    if PROFILER is None:
+        return NO_PROFILE
+    return PROFILER.phase(name, file_name)
+
+
+def create_documentation(threads=1, jobs=1, use_cache=True, stream=False, watch=False, fast=False,
+                         formats=("markdown",), dump_ir=None, load_ir=None, binary_ir=False, render_jobs=1,
+                         low_memory=False):
+    """
+    Function to create documentation.
+
+    Args:
+        threads (int): Number of threads used to walk the directory tree.
+        jobs (int): Number of processes used to parse the python files.
+        use_cache (bool): Whether to reuse parse results from previous runs.
+        stream (bool): Whether to write documentation section by section.
+        watch (bool): Whether to keep regenerating documentation as files
+            change, until interrupted.
+        fast (bool): Whether to extract docstrings with the fast scanner
+            where possible instead of building syntax trees.
+        formats (list): Names of the documentation formats to write, keys
+            of RENDERERS. The tree is parsed once for all of them.
+        dump_ir (str): File to save the parsed tree to with dump_tree, if any.
+        load_ir (str): File to load the tree from instead of parsing it, if
+            any. The tree is moved to this folder, which can differ from the
+            one it was parsed in.
+        binary_ir (bool): Whether to save the tree in the binary form
+            instead of JSON Lines.
+        render_jobs (int): Number of processes used to render the
+            documentation files of the first build.
+        low_memory (bool): Whether to parse and document one folder at a
+            time with build_tree_bounded instead of keeping the whole tree
+            in memory. The persistent parse cache is not used then, since
+            it holds the parse results of the whole tree, so use_cache has
+            no effect. Can not be combined with watch, dump_ir or load_ir,
+            which need the whole tree, nor with more than one thread, job or
+            render job, as folders are handled one at a time.
+
+    Returns:
+        Counter with the number of written and skipped documentation files.
+
+    Raises:
+        ValueError: If low_memory is combined with watch, dump_ir, load_ir,
+            threads, jobs or render_jobs.
+
+    """
+    if low_memory and (watch or dump_ir is not None or load_ir is not None):
+        raise ValueError("low_memory can not be combined with watch, dump_ir or load_ir")
+    if low_memory and max(threads, jobs, render_jobs) > 1:
+        raise ValueError("low_memory handles one folder at a time, it can not be combined with "
+                         "threads, jobs or render_jobs")
+
+    current_dir = dirname(realpath(__file__))
+    renderers = [RENDERERS[name]() for name in formats]
+
+    if low_memory:
+        # Parse results are only shared within a folder, the persistent cache would keep them all
+        stats, _ = build_tree_bounded(current_dir, current_dir, fast=fast, stream=stream, renderers=renderers)
+        return stats
+
+    cache = ParseCache(join(current_dir, CACHE_DIRNAME) if use_cache else None, fast=fast)
+
+    # Get the documentation for this (and all sub) directories
+    if load_ir is not None:
+        file_info = load_tree(load_ir, current_dir)
+        # No file is looked up, so unused entries can not be told apart
+        cache.prune = False
+        for datum in iter_folders(file_info):
+            makedirs(datum.name, exist_ok=True)
+    else:
+        file_info = parse_folder(current_dir, threads=threads, jobs=jobs, cache=cache)
+    if dump_ir is not None:
+        dump_tree(file_info, dump_ir, binary_ir)
+    stats = build_files(file_info, current_dir, stream=stream, known_hashes=cache.folders, renderers=renderers,
+                        render_jobs=render_jobs)
+    cache.set_folders(renderers, folder_hashes(file_info))
+    cache.save()
+
+    if watch:
+        print("Wrote {written} documentation files, skipped {skipped} unchanged.".format(**stats))
+        print("Watching {} for changes.".format(current_dir))
+        stats.update(watch_folder(file_info, current_dir, cache, stream, renderers=renderers))
+
+    return stats
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+
+    Args:
+        argv (list): Command line arguments, defaults to sys.argv.
+
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=1,
+                        help="walk sibling directories with this many threads")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="parse python files with this many processes")
+    parser.add_argument("--render-jobs", type=int, default=1,
+                        help="render documentation files with this many processes")
+    parser.add_argument("--no-cache", dest="use_cache", action="store_false",
+                        help="parse every file instead of reusing the results of earlier runs")
+    parser.add_argument("--stream", action="store_true",
+                        help="write documentation section by section to bound memory use")
+    parser.add_argument("--low-memory", action="store_true",
+                        help="parse and document one folder at a time, so memory use is bounded by "
+                             "the largest folder; the parse cache is not used, so --no-cache has no "
+                             "effect, and --threads, --jobs and --render-jobs are rejected")
+    parser.add_argument("--watch", action="store_true",
+                        help="regenerate documentation whenever python files change")
+    parser.add_argument("--fast", action="store_true",
+                        help="extract docstrings without building syntax trees where possible")
+    parser.add_argument("--format", dest="formats", action="append", choices=sorted(RENDERERS),
+                        help="documentation format to write, repeat to write several from one parse "
+                             "(default: markdown)")
+    parser.add_argument("--dump-ir", metavar="FILE",
+                        help="save the parsed tree to FILE, to render it later with --load-ir")
+    parser.add_argument("--binary-ir", action="store_true",
+                        help="save the parsed tree in the binary form instead of JSON Lines")
+    parser.add_argument("--load-ir", metavar="FILE",
+                        help="render the tree saved in FILE instead of parsing the python files")
+    parser.add_argument("--profile", action="store_true",
+                        help="print the time spent in each phase and the slowest files to parse, "
+                             "work in --jobs and --render-jobs processes is not timed")
+    parser.add_argument("--profile-stats", metavar="FILE",
+                        help="save cProfile statistics of the run to FILE, to read with pstats")
+    parser.add_argument("--memo-stats", action="store_true",
+                        help="report the docstring memo hits and misses of this process, "
+                             "which does not parse any files with --jobs")
+    args = parser.parse_args(argv)
+
+    profiler = Profiler()
+    if args.profile or args.profile_stats is not None:
+        context = profiling(profiler, args.profile_stats)
+    else:
+        context = NO_PROFILE
+    with context:
+        stats = create_documentation(threads=args.threads, jobs=args.jobs, use_cache=args.use_cache,
+                                     stream=args.stream, watch=args.watch, fast=args.fast,
+                                     formats=args.formats or ["markdown"], dump_ir=args.dump_ir,
+                                     load_ir=args.load_ir, binary_ir=args.binary_ir,
+                                     render_jobs=args.render_jobs, low_memory=args.low_memory)
+    print("Wrote {written} documentation files, skipped {skipped} unchanged.".format(**stats))
+    if args.profile:
+        print(profiler.summary())
+    if args.memo_stats:
+        print("Docstring memo: {hits} hits, {misses} misses, {size}/{maxsize} entries.".format(
+            **docstring_memo_stats()))
 
 
 if __name__ == "__main__":
-    create_documentation()
+    main()